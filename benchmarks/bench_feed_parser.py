@@ -0,0 +1,89 @@
+"""
+Compares the two feed parsing paths in modules/news_fetcher.py on
+synthetic RSS documents of growing size:
+
+  feedparser : buffer the whole body, feedparser.parse, keep the newest entries
+  stream     : iterparse the body chunk by chunk, stop after enough entries
+
+Run from the repo root:
+    python -m benchmarks.bench_feed_parser
+"""
+import statistics
+import time
+import tracemalloc
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from config import ARTICLES_PER_FEED
+from modules.news_fetcher import (
+    FEED_CHUNK_SIZE, parse_feed_document, parse_feed_stream, select_top_articles
+)
+
+SIZES = [50, 500, 2000]   # items per synthetic feed
+REPEATS = 5
+
+def make_rss(item_count):
+    """
+    Newest-first RSS 2.0 document with ~1 KB of HTML description per item.
+    """
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    body = "&lt;p&gt;" + ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16) + "&lt;/p&gt;"
+    items = []
+    for i in range(item_count):
+        published = format_datetime(now - timedelta(minutes=i * 7))
+        items.append(
+            f"<item><title>Story {i}: Parliament debates reform bill</title>"
+            f"<link>https://news.example.com/2026/01/story-{i}?utm_source=rss</link>"
+            f"<guid>https://news.example.com/2026/01/story-{i}</guid>"
+            f"<pubDate>{published}</pubDate><description>{body}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        "<title>Synthetic</title><link>https://news.example.com</link>"
+        + "".join(items) + "</channel></rss>"
+    ).encode("utf-8")
+
+def as_chunks(document):
+    for start in range(0, len(document), FEED_CHUNK_SIZE):
+        yield document[start:start + FEED_CHUNK_SIZE]
+
+def run_feedparser(document):
+    # Mirrors response.content: the whole body is joined before parsing
+    body = b"".join(as_chunks(document))
+    articles, _ = parse_feed_document(body)
+    return select_top_articles(articles, ARTICLES_PER_FEED)
+
+def run_stream(document):
+    articles = parse_feed_stream(as_chunks(document))
+    return select_top_articles(articles, ARTICLES_PER_FEED)
+
+def measure(func, document):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(document)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(document)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, result
+
+def main():
+    print(f"{'items':>6} {'doc KB':>7} | {'feedparser ms':>13} {'peak KB':>8} | {'stream ms':>9} {'peak KB':>8} | {'speedup':>7}")
+    for size in SIZES:
+        document = make_rss(size)
+        fp_time, fp_peak, fp_result = measure(run_feedparser, document)
+        st_time, st_peak, st_result = measure(run_stream, document)
+
+        # Both paths must agree on the selected stories
+        assert [a['link'] for a in fp_result] == [a['link'] for a in st_result], "parsers disagree"
+
+        print(
+            f"{size:>6} {len(document) / 1024:>7.0f} | {fp_time * 1000:>13.1f} {fp_peak / 1024:>8.0f} | "
+            f"{st_time * 1000:>9.1f} {st_peak / 1024:>8.0f} | {fp_time / st_time:>6.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compares two ways of rendering report sections in modules/pdf_generator.py
+on the verify_pdf.py report, each section repeated up to 100x (a weekly
+compilation with hundreds of stories):
+
+  per-span : write() per span, font and color set and restored around
+             every fragment, fpdf's per-character line breaker
+  batched  : NewspaperPDF.article_content (merged same-style runs,
+             redundant state changes skipped, word-level wrapping)
+
+Run from the repo root:
+    python -m benchmarks.bench_pdf
+"""
+import statistics
+import time
+import tracemalloc
+
+from modules import document
+from modules.pdf_generator import (
+    NewspaperPDF, COLOR_ACCENT, COLOR_BODY, COLOR_PRIMARY, COLOR_TEXT_DARK,
+    add_report_section, section_plan
+)
+from verify_pdf import ai_report
+
+SCALES = [1, 10, 100]   # copies of each section
+REPEATS = 3
+
+def clean_text_per_call(text):
+    # Mirrors the old clean_text_for_pdf: one str.replace per mapping
+    if not text: return ""
+    replacements = {
+        '‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-',
+        '…': '...', '•': '*', '**': ''
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+class PerSpanPDF(NewspaperPDF):
+    def write_toggled(self, text, style, color=None, link=""):
+        current_font = self.font_family
+        current_style = self.font_style
+        current_size = self.font_size_pt
+        current_color = self.text_color
+        if color:
+            self.set_text_color(*color)
+        self.set_font(current_font, style, current_size)
+        self.write(5, text, link=link)
+        self.set_text_color(current_color.r, current_color.g, current_color.b)
+        self.set_font(current_font, current_style, current_size)
+
+    def article_content(self, title, body):
+        self.set_font('Times', 'B', 14)
+        self.set_text_color(*COLOR_TEXT_DARK)
+        self.multi_cell(0, 6, clean_text_per_call(title))
+        self.ln(2)
+
+        for paragraph in document.parse(body):
+            is_headline = paragraph.kind != document.TEXT
+            if is_headline:
+                self.ln(4)
+                self.set_font('Times', 'B', 12)
+                self.set_text_color(*COLOR_PRIMARY)
+            else:
+                self.set_font('Times', '', 11)
+                self.set_text_color(*COLOR_BODY)
+
+            for span in paragraph.spans:
+                text = clean_text_per_call(span.text)
+                if not text:
+                    continue
+                if span.kind == document.LINK:
+                    self.write_toggled(text, 'U', COLOR_ACCENT, span.url)
+                elif span.kind == document.BOLD:
+                    style = self.font_style
+                    self.write_toggled(text, style.replace('B', '') if 'B' in style else style + 'B')
+                else:
+                    self.write(5, text)
+
+            self.ln(6)
+            if not is_headline:
+                self.ln(2)
+
+def scaled_report(copies):
+    return {category: "\n".join([summary] * copies) for category, summary in ai_report.items()}
+
+def render(pdf_class, report):
+    # Same page setup as start_daily_pdf()
+    pdf = pdf_class()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.set_margins(10, 10, 10)
+    pdf.add_page()
+    for category, display_title in section_plan(report.keys()):
+        add_report_section(pdf, display_title, report[category])
+    pdf.output()
+    return pdf.pages_count
+
+def measure(pdf_class, report):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        pages = render(pdf_class, report)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(pdf_class, report)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, pages
+
+def main():
+    print(f"{'copies':>6} {'pages':>5} | {'per-span pg/s':>13} {'peak MB':>8} | {'batched pg/s':>12} {'peak MB':>8} | {'speedup':>7}")
+    for copies in SCALES:
+        report = scaled_report(copies)
+        old_time, old_peak, old_pages = measure(PerSpanPDF, report)
+        new_time, new_peak, new_pages = measure(NewspaperPDF, report)
+
+        # Both paths must lay the edition out on the same number of pages
+        assert old_pages == new_pages, "renderers disagree"
+
+        print(
+            f"{copies:>6} {new_pages:>5} | {old_pages / old_time:>13.1f} {old_peak / 1e6:>8.1f} | "
+            f"{new_pages / new_time:>12.1f} {new_peak / 1e6:>8.1f} | {old_time / new_time:>6.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
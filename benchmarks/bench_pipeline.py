@@ -0,0 +1,241 @@
+"""
+End-to-end benchmark of the digest stages against local stand-ins
+(modules/replay.py), on synthetic inputs from 4 categories / 20 articles
+up to 200 categories / 2,000 articles.
+
+For every stage it reports wall time, peak RSS and peak traced Python
+allocations, and compares them with benchmarks/baseline.json. Any stage
+slower (or hungrier) than the baseline beyond the tolerance fails the run.
+
+Stand-in latencies, the Bytez quota pacing, the LLM cache and the pause
+between Slack parts are all switched off, so the numbers measure code
+rather than sleeps.
+
+Run from the repo root:
+    python -m benchmarks.bench_pipeline                    # compare with baseline
+    python -m benchmarks.bench_pipeline --update-baseline  # record a new baseline
+    python -m benchmarks.bench_pipeline --scales 4x20 20x200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+# The stand-ins must be configured before config.py is imported
+FIXTURES_DIR = tempfile.mkdtemp(prefix="digest-bench-")
+os.environ["DIGEST_REPLAY"] = "replay"
+os.environ["DIGEST_FIXTURES_DIR"] = FIXTURES_DIR
+os.environ["DIGEST_REPLAY_FEED_LATENCY"] = "0"
+os.environ["DIGEST_REPLAY_LLM_LATENCY"] = "0"
+os.environ["DIGEST_REPLAY_SLACK_LATENCY"] = "0"
+# Measure the code, not the client-side Bytez quota pacing, and make
+# the second (tracemalloc) pass of summarize_news call the stand-in again
+os.environ["DIGEST_NO_RATE_LIMIT"] = "1"
+os.environ["DIGEST_NO_LLM_CACHE"] = "1"
+
+import config
+from modules import replay, slack_bot
+from modules.news_fetcher import fetch_rss_news, filter_by_interests
+from modules.ai_handler import summarize_news
+from modules.pdf_generator import generate_daily_pdf
+from modules.slack_bot import paginate_report, send_daily_digest
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SCALES = ["4x20", "20x200", "200x2000"]   # categories x articles
+FEEDS_PER_CATEGORY = 2
+
+# A stage regresses when it is slower than baseline * (1 + tolerance) + slack
+WALL_TOLERANCE = 0.25
+WALL_SLACK_SECONDS = 0.05
+MEMORY_TOLERANCE = 0.25
+MEMORY_SLACK_MB = 2.0
+# Peak RSS includes the interpreter and imported modules, and the
+# allocator returns memory lazily, so it gets more headroom
+RSS_TOLERANCE = 0.25
+RSS_SLACK_MB = 10.0
+
+CATEGORY_NAMES = [
+    "⚖️ International Law", "🌍 International Relations",
+    "🇵🇰 National & Political (Pakistan)", "💻 Tech & Innovation"
+]
+
+def build_fixtures(category_count, article_count):
+    """
+    Writes synthetic feed fixtures and points config.RSS_FEEDS at them.
+    """
+    feeds_dir = os.path.join(FIXTURES_DIR, "feeds")
+    os.makedirs(feeds_dir, exist_ok=True)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    per_feed = max(1, article_count // (category_count * FEEDS_PER_CATEGORY))
+
+    index = {}
+    rss_feeds = {}
+    for c in range(category_count):
+        name = CATEGORY_NAMES[c % len(CATEGORY_NAMES)]
+        if c >= len(CATEGORY_NAMES):
+            name = f"{name} {c // len(CATEGORY_NAMES)}"
+        rss_feeds[name] = []
+        for f in range(FEEDS_PER_CATEGORY):
+            url = f"https://feed{f}.bench{c}.example.com/rss.xml"
+            items = "".join(
+                f"<item><title>Category {c} feed {f} story {i}: ministers clash over reform</title>"
+                f"<link>https://www{f}.bench{c}.example.com/story/{i}</link>"
+                f"<pubDate>{format_datetime(now - timedelta(minutes=17 * i + f))}</pubDate>"
+                f"<description>Lawmakers in capital {c} debated item {i} as critics warned of delays.</description></item>"
+                for i in range(per_feed)
+            )
+            body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>bench</title>{items}</channel></rss>'
+            fixture = replay.feed_key(url) + ".xml"
+            with open(os.path.join(feeds_dir, fixture), "w", encoding="utf-8") as fh:
+                fh.write(body)
+            index[url] = {"file": fixture, "content_type": "application/rss+xml"}
+            rss_feeds[name].append(url)
+
+    with open(os.path.join(feeds_dir, "index.json"), "w", encoding="utf-8") as fh:
+        json.dump(index, fh)
+
+    # Modules hold a reference to this dict, so update it in place
+    config.RSS_FEEDS.clear()
+    config.RSS_FEEDS.update(rss_feeds)
+
+def _read_status_kb(field):
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM (the peak RSS counter)
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb():
+    hwm = _read_status_kb("VmHWM")
+    if hwm is not None:
+        return hwm / 1024
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_stage(func, *args):
+    """
+    Runs a stage twice: once for wall time and peak RSS, once under
+    tracemalloc for peak Python allocations (tracing slows code down, so
+    the two are kept apart).
+    Returns: (result, {"wall_s", "peak_rss_mb", "alloc_peak_mb"})
+    """
+    _reset_peak_rss()
+    start = time.perf_counter()
+    result = func(*args)
+    wall = time.perf_counter() - start
+    rss = _peak_rss_mb()
+
+    tracemalloc.start()
+    func(*args)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {"wall_s": round(wall, 4), "peak_rss_mb": round(rss, 1), "alloc_peak_mb": round(alloc_peak / 1e6, 2)}
+
+def pdf_report(ai_report):
+    """
+    The PDF prints only its SECTION_MAPPING sections, so every category's
+    summary is folded into the section of its base name; the PDF input
+    then grows with the category count like the other stages.
+    """
+    merged = {}
+    for category, summary in ai_report.items():
+        base = next((name for name in CATEGORY_NAMES if category.startswith(name)), category)
+        merged.setdefault(base, []).append(summary)
+    return {category: "\n\n".join(summaries) for category, summaries in merged.items()}
+
+def bench_scale(category_count, article_count):
+    build_fixtures(category_count, article_count)
+    results = {}
+
+    news_data, results["fetch_rss_news"] = run_stage(fetch_rss_news)
+    news_roundup, results["filter_by_interests"] = run_stage(filter_by_interests, news_data)
+    ai_report, results["summarize_news"] = run_stage(summarize_news, news_roundup)
+    pdf_path, results["generate_daily_pdf"] = run_stage(generate_daily_pdf, pdf_report(ai_report))
+    _, results["paginate_report"] = run_stage(paginate_report, ai_report)
+    _, results["send_daily_digest"] = run_stage(send_daily_digest, ai_report, None, pdf_path)
+
+    if pdf_path and os.path.exists(pdf_path):
+        os.remove(pdf_path)
+    return results
+
+def find_regressions(scale, results, baseline):
+    regressions = []
+    for stage, now in results.items():
+        base = baseline.get(scale, {}).get(stage)
+        if not base:
+            continue
+        if now["wall_s"] > base["wall_s"] * (1 + WALL_TOLERANCE) + WALL_SLACK_SECONDS:
+            regressions.append(f"{scale} {stage}: wall {now['wall_s']:.3f}s vs baseline {base['wall_s']:.3f}s")
+        if now["peak_rss_mb"] > base["peak_rss_mb"] * (1 + RSS_TOLERANCE) + RSS_SLACK_MB:
+            regressions.append(f"{scale} {stage}: peak RSS {now['peak_rss_mb']:.1f}MB vs baseline {base['peak_rss_mb']:.1f}MB")
+        if now["alloc_peak_mb"] > base["alloc_peak_mb"] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK_MB:
+            regressions.append(f"{scale} {stage}: alloc peak {now['alloc_peak_mb']:.1f}MB vs baseline {base['alloc_peak_mb']:.1f}MB")
+    return regressions
+
+def main():
+    # The one-second pause between Slack parts would dominate send_daily_digest
+    slack_bot.SLACK_POST_INTERVAL = 0
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES, help="CATEGORIESxARTICLES, e.g. 20x200")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    all_results = {}
+    regressions = []
+    for scale in args.scales:
+        category_count, article_count = (int(n) for n in scale.lower().split("x"))
+        print(f"=== {category_count} categories x {article_count} articles ===")
+        all_results[scale] = bench_scale(category_count, article_count)
+        regressions += find_regressions(scale, all_results[scale], baseline)
+
+    print()
+    print(f"{'scale':<10} {'stage':<22} {'wall s':>9} {'peak RSS MB':>12} {'alloc MB':>9}")
+    for scale, results in all_results.items():
+        for stage, r in results.items():
+            print(f"{scale:<10} {stage:<22} {r['wall_s']:>9.3f} {r['peak_rss_mb']:>12.1f} {r['alloc_peak_mb']:>9.2f}")
+
+    if args.update_baseline:
+        baseline.update(all_results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=1, sort_keys=True)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    if not baseline:
+        print("\nNo baseline yet; run with --update-baseline to store one.")
+        return 0
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Regression check: every Bytez call answered with one 429 first (replay
+429 injection) must still produce every section, in each request mode.
+More categories are summarized than the pool holds connections per host,
+so a 429 response that is never closed exhausts the pool and hangs the
+run instead of finishing.
+
+Each mode runs in its own interpreter (config reads DIGEST_* at import)
+under a time limit.
+
+Run from the repo root:
+    python -m benchmarks.check_replay_429
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+CATEGORIES = 8          # > HTTP_MAX_CONNECTIONS_PER_HOST
+TIME_LIMIT = 120        # seconds per mode; a leak hangs far longer
+
+MODES = {
+    "plain": {},
+    "stream": {"DIGEST_STREAM": "1"},
+    "hedge": {"DIGEST_HEDGE": "1"},
+    "stream + hedge": {"DIGEST_STREAM": "1", "DIGEST_HEDGE": "1"},
+}
+
+def run_child():
+    from modules import ai_handler, replay
+    replay.start()
+    news = {
+        f"Category {c}": [
+            {"title": f"Story {c}-{i}", "link": f"https://site{c}.example.com/{i}", "summary": "Details."}
+            for i in range(3)
+        ]
+        for c in range(CATEGORIES)
+    }
+    report = ai_handler.summarize_news(news)
+    failed = [category for category, summary in report.items() if summary.startswith("⚠️")]
+    print(f"RESULT {len(report) - len(failed)}/{len(report)}")
+
+def run_mode(name, extra_env):
+    env = dict(
+        os.environ,
+        DIGEST_REPLAY="replay",
+        DIGEST_FIXTURES_DIR=tempfile.mkdtemp(prefix="digest-429-"),
+        DIGEST_REPLAY_429_RATE="1",
+        DIGEST_REPLAY_LLM_LATENCY="0",
+        DIGEST_NO_LLM_CACHE="1",
+        DIGEST_NO_RATE_LIMIT="1",
+        **extra_env
+    )
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.check_replay_429", "--child"],
+            env=env, capture_output=True, text=True, timeout=TIME_LIMIT
+        )
+    except subprocess.TimeoutExpired:
+        return False, f"no result after {TIME_LIMIT}s (hung)"
+    lines = [line for line in result.stdout.splitlines() if line.startswith("RESULT ")]
+    if result.returncode != 0 or not lines:
+        return False, (result.stderr.strip().splitlines() or ["crashed"])[-1]
+    done = lines[-1].split()[1]
+    return done == f"{CATEGORIES}/{CATEGORIES}", f"{done} sections"
+
+def main():
+    ok = True
+    for name, extra_env in MODES.items():
+        passed, detail = run_mode(name, extra_env)
+        ok = ok and passed
+        print(f"{'ok' if passed else 'FAIL':<5} {name:<15} {detail}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        run_child()
+    else:
+        main()
@@ -0,0 +1,91 @@
+"""
+Regression check: with hedging on and the first model slow for every
+category at once, each section must be won by its hedge, well before the
+slow model would have answered. As many categories run as there are
+summary workers, so the primaries hold every pooled connection to the
+host; a hedge that queued behind them could never win.
+
+Each mode runs in its own interpreter (config reads DIGEST_* at import)
+under a time limit.
+
+Run from the repo root:
+    python -m benchmarks.check_replay_hedge
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SLOW_LATENCY = 30       # seconds the first model takes to answer
+HEDGE_DELAY = 1         # seconds before a hedge is sent
+TIME_LIMIT = 120        # seconds per mode
+
+MODES = {
+    "hedge": {},
+    "stream + hedge": {"DIGEST_STREAM": "1"},
+}
+
+def run_child():
+    from config import SUMMARY_WORKERS
+    from modules import ai_handler, metrics, replay
+    replay.start()
+    # Hedge after a second, and allow one per category
+    ai_handler.HEDGE_MIN_DELAY = ai_handler.HEDGE_DEFAULT_DELAY = HEDGE_DELAY
+    ai_handler.HEDGE_MAX_RATE = 1.0
+    news = {
+        f"Category {c}": [
+            {"title": f"Story {c}-{i}", "link": f"https://site{c}.example.com/{i}", "summary": "Details."}
+            for i in range(3)
+        ]
+        for c in range(SUMMARY_WORKERS)
+    }
+    start = time.perf_counter()
+    report = ai_handler.summarize_news(news)
+    elapsed = time.perf_counter() - start
+    failed = [category for category, summary in report.items() if summary.startswith("⚠️")]
+    wins = metrics.snapshot()["counters"].get("llm.hedge_wins", 0)
+    print(f"RESULT {len(report) - len(failed)} {wins} {len(report)} {elapsed:.1f}")
+
+def run_mode(name, extra_env):
+    from modules.ai_handler import MODELS
+    env = dict(
+        os.environ,
+        DIGEST_REPLAY="replay",
+        DIGEST_FIXTURES_DIR=tempfile.mkdtemp(prefix="digest-hedge-"),
+        DIGEST_REPLAY_SLOW_MODEL=MODELS[0],
+        DIGEST_REPLAY_SLOW_LATENCY=str(SLOW_LATENCY),
+        DIGEST_REPLAY_LLM_LATENCY="0.2",
+        DIGEST_HEDGE="1",
+        DIGEST_NO_LLM_CACHE="1",
+        DIGEST_NO_RATE_LIMIT="1",
+        **extra_env
+    )
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.check_replay_hedge", "--child"],
+            env=env, capture_output=True, text=True, timeout=TIME_LIMIT
+        )
+    except subprocess.TimeoutExpired:
+        return False, f"no result after {TIME_LIMIT}s (hung)"
+    lines = [line for line in result.stdout.splitlines() if line.startswith("RESULT ")]
+    if result.returncode != 0 or not lines:
+        return False, (result.stderr.strip().splitlines() or ["crashed"])[-1]
+    done, wins, total, elapsed = lines[-1].split()[1:]
+    # Hedges that waited for the primaries would finish after SLOW_LATENCY
+    passed = done == total and wins == total and float(elapsed) < SLOW_LATENCY / 2
+    return passed, f"{done}/{total} sections, {wins} hedge wins in {elapsed}s"
+
+def main():
+    ok = True
+    for name, extra_env in MODES.items():
+        passed, detail = run_mode(name, extra_env)
+        ok = ok and passed
+        print(f"{'ok' if passed else 'FAIL':<5} {name:<15} {detail}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        run_child()
+    else:
+        main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -8,6 +9,36 @@ load_dotenv()
 SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.environ.get("SLACK_CHANNEL_ID") # Variable name in code is APP_TOKEN but maps to Channel ID
 BYTEZ_API_KEY = os.environ.get("BYTEZ_API_KEY")
+SLACK_POST_INTERVAL = 1     # seconds between digest parts (rate limit safety)
+
+# Local storage. The cache dir is restored between GitHub Actions runs.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+# -------------------------------------------------------------------------
+# R E C O R D  /  R E P L A Y   (see modules/replay.py, run_now.py --help)
+# -------------------------------------------------------------------------
+
+REPLAY_MODE = os.environ.get("DIGEST_REPLAY", "off")   # off | record | replay
+REPLAY_FIXTURES_DIR = os.environ.get("DIGEST_FIXTURES_DIR", os.path.join(DATA_DIR, "fixtures"))
+REPLAY_FEED_LATENCY = float(os.environ.get("DIGEST_REPLAY_FEED_LATENCY", "0.05"))   # seconds
+REPLAY_LLM_LATENCY = float(os.environ.get("DIGEST_REPLAY_LLM_LATENCY", "0.5"))      # seconds
+REPLAY_SLACK_LATENCY = float(os.environ.get("DIGEST_REPLAY_SLACK_LATENCY", "0.01")) # seconds
+REPLAY_429_RATE = float(os.environ.get("DIGEST_REPLAY_429_RATE", "0"))          # share of LLM calls rate limited once
+REPLAY_FAILURE_RATE = float(os.environ.get("DIGEST_REPLAY_FAILURE_RATE", "0"))  # share of requests answered with 500
+REPLAY_SLOW_MODEL = os.environ.get("DIGEST_REPLAY_SLOW_MODEL", "")              # answers after REPLAY_SLOW_LATENCY
+REPLAY_SLOW_LATENCY = float(os.environ.get("DIGEST_REPLAY_SLOW_LATENCY", "30"))  # seconds
+REPLAY_SEED = 1234
+
+if REPLAY_MODE != "off":
+    # Start from empty caches so recordings are complete and replays repeatable
+    CACHE_DIR = tempfile.mkdtemp(prefix="digest-cache-")
+if REPLAY_MODE == "replay":
+    # The stand-in servers accept any credentials
+    SLACK_BOT_TOKEN = SLACK_BOT_TOKEN or "xoxb-replay"
+    SLACK_APP_TOKEN = SLACK_APP_TOKEN or "CREPLAY"
+    BYTEZ_API_KEY = BYTEZ_API_KEY or "replay-key"
 
 # -------------------------------------------------------------------------
 # S O U R C E   L I S T
@@ -51,3 +82,162 @@ RSS_FEEDS = {
 }
 SCHEDULE_TIME = "12:00"
 
+# -------------------------------------------------------------------------
+# F E T C H   E N G I N E
+# -------------------------------------------------------------------------
+
+FETCH_MAX_WORKERS = 8        # Feeds downloaded in parallel
+FEED_CONNECT_TIMEOUT = 5     # Seconds to open a connection to a feed host
+FEED_READ_TIMEOUT = 15       # Seconds to wait between bytes from a feed host
+FETCH_DEADLINE = 90          # Global budget (seconds) for one fetch cycle; late feeds are dropped
+
+
+# Conditional GET (ETag / Last-Modified) cache, so unchanged feeds cost a 304
+FEED_CACHE_ENABLED = True
+FEED_CACHE_PATH = os.path.join(CACHE_DIR, "feed_cache.json")
+
+# Cross-run article dedup: stories already sent are skipped for this many days
+DEDUP_ENABLED = True
+DEDUP_TTL_DAYS = 7
+DEDUP_INDEX_PATH = os.path.join(CACHE_DIR, "seen_articles.json")
+
+# Near-duplicate clustering (SimHash). Higher = more aggressive merging.
+CLUSTER_ENABLED = True
+CLUSTER_MAX_HAMMING = 6
+
+# Pipeline: "streaming" hands each category to the LLM as soon as its feeds
+# are in and renders sections as summaries arrive; "sequential" runs each
+# stage to completion before starting the next.
+PIPELINE_MODE = "streaming"
+
+# Article selection: newest stories win, merged across all feeds of a category
+ARTICLES_PER_FEED = 15          # Most recent entries kept from each feed
+ARTICLES_PER_CATEGORY = 20      # Global top-k per category, by publish time
+MAX_ARTICLES_PER_SOURCE = 5     # Diversity cap per publisher (None = no cap)
+# Per-category overrides, e.g.
+# "🌍 International Relations": {"top_k": 25, "max_per_source": 3}
+CATEGORY_SELECTION = {}
+
+# Feed health: per-feed latency/error stats and a circuit breaker
+FEED_HEALTH_PATH = os.path.join(CACHE_DIR, "feed_health.json")
+CIRCUIT_FAILURE_THRESHOLD = 3     # Consecutive failures before a feed is skipped
+CIRCUIT_COOLDOWN_HOURS = 6        # First cooldown; doubles on each failed probe
+CIRCUIT_MAX_COOLDOWN_HOURS = 72
+
+# Feed parsing: "stream" parses RSS/Atom incrementally and stops after
+# FEED_STREAM_MAX_ENTRIES items (falls back to feedparser on malformed XML);
+# "feedparser" downloads and parses the whole document.
+FEED_PARSER = "stream"
+FEED_STREAM_MAX_ENTRIES = 30
+FEED_MAX_BYTES = 2 * 1024 * 1024
+
+# -------------------------------------------------------------------------
+# L L M   T H R O U G H P U T
+# -------------------------------------------------------------------------
+
+SUMMARY_WORKERS = 4                 # Categories summarized concurrently
+# Client-side quota pacing; DIGEST_NO_RATE_LIMIT=1 turns it off (benchmarks, offline replays)
+RATE_LIMIT_ENABLED = os.environ.get("DIGEST_NO_RATE_LIMIT") != "1"
+BYTEZ_REQUESTS_PER_MINUTE = 20      # Shared by all workers
+BYTEZ_TOKENS_PER_MINUTE = 60000     # Prompt + expected completion tokens
+EXPECTED_OUTPUT_TOKENS = 1500       # Completion estimate charged per request
+BACKOFF_BASE_SECONDS = 2            # 429 without Retry-After: 2s, 4s, 8s ... (jittered)
+BACKOFF_MAX_SECONDS = 60
+
+# Model routing: per-model success/latency scoreboard, persisted across runs.
+# Models that keep failing are ejected (skipped) for a cooldown; models
+# below MODEL_MIN_SUCCESS_RATE are tried after the healthy ones.
+MODEL_SCOREBOARD_PATH = os.path.join(CACHE_DIR, "model_scoreboard.json")
+MODEL_EJECT_AFTER = 3               # Consecutive errors/empty outputs before ejection
+MODEL_EJECT_HOURS = 2               # First ejection; doubles on each failed probe
+MODEL_MAX_EJECT_HOURS = 24
+MODEL_MIN_SUCCESS_RATE = 0.5
+MODEL_MIN_SAMPLES = 3               # Calls before a model's success rate counts
+
+# Prompt packing: article lines (plus truncated RSS summaries when there is
+# room) are packed into each model's context window, so fallbacks to
+# smaller models get fewer articles instead of an oversized prompt.
+MODEL_CONTEXT_WINDOWS = {           # Tokens, as served by Bytez
+    "anthropic/claude-opus-4-6": 200000,
+    "Qwen/Qwen3-8B": 32768,
+    "Qwen/Qwen3-4B-Thinking-2507": 8192,
+    "mistralai/Mistral-7B-Instruct-v0.3": 8192,
+    "anthropic/claude-opus-4-5": 200000,
+    "openai/gpt-oss-20b": 32768,
+    "meta-llama/Meta-Llama-3.1-8B-Instruct": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+PROMPT_OUTPUT_RESERVE_TOKENS = 4096 # Left free for the answer (and any reasoning)
+PROMPT_MAX_INPUT_TOKENS = 16000     # Cap for large-context models
+PROMPT_SUMMARY_CHARS = 300          # Per-article RSS summary excerpt
+
+# Hedged requests: when the first model hasn't answered within its
+# HEDGE_PERCENTILE latency (HEDGE_DEFAULT_DELAY until it has enough samples),
+# the next model starts in parallel and the first valid answer wins.
+HEDGE_ENABLED = os.environ.get("DIGEST_HEDGE") == "1"
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY = 90            # Seconds
+HEDGE_MIN_DELAY = 10
+HEDGE_MAX_RATE = 0.25               # Hedged / total summary requests per run
+HEDGE_MAX_TOKENS = 40000            # Extra (estimated) tokens hedges may spend per run
+
+# Incremental summaries: each category's last delivered summary and the
+# articles it covered are kept; later runs send only new articles plus that
+# summary and ask for an update. Categories with nothing new reuse it as-is.
+INCREMENTAL_ENABLED = os.environ.get("DIGEST_INCREMENTAL") == "1"
+SUMMARY_STATE_PATH = os.path.join(CACHE_DIR, "summary_state.json")
+INCREMENTAL_MAX_AGE_HOURS = 20      # Older summaries are rebuilt from scratch
+
+# Streaming: read Bytez output as it is generated, dropping <think>
+# monologue on the fly. Reasoning past STREAM_MAX_THINKING_CHARS aborts the
+# call (the next model takes over); answers are cut at the output/time caps.
+BYTEZ_STREAM = os.environ.get("DIGEST_STREAM") == "1"
+STREAM_MAX_OUTPUT_CHARS = 20000     # Visible answer per section
+STREAM_MAX_THINKING_CHARS = 12000   # Runaway reasoning cutoff
+STREAM_MAX_SECONDS = 240            # Per-section time cap
+
+# Batched generation: summarize_news packs up to BATCH_MAX_CATEGORIES
+# categories into one request to a model with at least BATCH_MIN_CONTEXT
+# tokens of context. Sections missing from the answer are retried one by one.
+BATCH_ENABLED = os.environ.get("DIGEST_BATCH") == "1"
+BATCH_MAX_CATEGORIES = 4
+BATCH_MIN_CONTEXT = 100000
+BATCH_MIN_SECTION_CHARS = 40        # Shorter sections count as malformed
+
+# Local extractive summaries (modules/summarizer.py, NumPy TF-IDF + TextRank):
+# "last" fills sections no model could write, "first" writes every section
+# locally without calling Bytez, "off" leaves the failure notice.
+LOCAL_SUMMARY_TIER = os.environ.get("DIGEST_LOCAL_SUMMARY", "last")
+LOCAL_SUMMARY_MAX_ITEMS = 8         # Stories per locally written section
+
+# Content-addressed cache of Bytez responses (reruns cost zero tokens)
+LLM_CACHE_ENABLED = os.environ.get("DIGEST_NO_LLM_CACHE") != "1"
+LLM_CACHE_DIR = os.path.join(CACHE_DIR, "llm")
+LLM_CACHE_MAX_AGE_HOURS = 48
+LLM_CACHE_MAX_MB = 50
+LLM_CACHE_EVICT_INTERVAL_HOURS = 1  # Long-running schedulers re-evict this often
+
+# Full-text extraction (modules/analyst.py): concurrent, per-site polite
+# downloads, parse/NLP in a process pool, results cached per canonical URL
+ANALYST_CACHE_DIR = os.path.join(CACHE_DIR, "articles")
+ANALYST_CACHE_TTL_DAYS = 7
+ANALYST_DOWNLOAD_WORKERS = 8
+ANALYST_PER_DOMAIN = 2              # Concurrent downloads per site
+ANALYST_DOMAIN_DELAY = 0.5          # Seconds between request starts to one site
+ANALYST_PARSE_WORKERS = None        # Parse/NLP processes (None = CPU count)
+ANALYST_MAX_TEXT_CHARS = 20000      # Body text kept in the cache
+# Enrich section prompts with summaries extracted from the full articles
+ENRICH_PROMPTS = os.environ.get("DIGEST_FULL_TEXT") == "1"
+ENRICH_TOP_N = 8                    # Highest-ranked articles enriched per category
+ENRICH_SUMMARY_CHARS = 800          # Prompt excerpt per enriched article
+
+# Shared HTTP client: keep-alive connection pools for feeds and Bytez
+HTTP_POOL_HOSTS = 32                # Host pools kept open
+HTTP_MAX_CONNECTIONS_PER_HOST = 4
+HTTP_POOL_TIMEOUT = 360             # Wait for a free connection; longer than any one Bytez call,
+                                    # so only a leaked (never closed) response turns into an error
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 30
+HTTP2_ENABLED = False               # Bytez over HTTP/2; needs `pip install httpx[http2]`
+BYTEZ_CONNECT_TIMEOUT = 10
+BYTEZ_READ_TIMEOUT = 300            # Long generations for deep research sections
@@ -1,14 +1,47 @@
 import os
-import requests
 import json
 import time
 import re
+import codecs
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules import http_client, llm_cache, metrics, model_router, prompt_packer, replay, summary_state
+from modules.news_fetcher import article_source
+from modules.rate_limiter import RateLimiter, backoff_delay, estimate_tokens, parse_retry_after
 # Ensure you have a config.py file with BYTEZ_API_KEY defined, 
 # or replace this import with your actual key string.
 try:
     from config import BYTEZ_API_KEY
 except ImportError:
     BYTEZ_API_KEY = "YOUR_API_KEY_HERE"
+from config import (
+    SUMMARY_WORKERS, BYTEZ_REQUESTS_PER_MINUTE, BYTEZ_TOKENS_PER_MINUTE, EXPECTED_OUTPUT_TOKENS,
+    BYTEZ_CONNECT_TIMEOUT, BYTEZ_READ_TIMEOUT, HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_DELAY, HEDGE_MAX_RATE, HEDGE_MAX_TOKENS, INCREMENTAL_ENABLED, BYTEZ_STREAM,
+    STREAM_MAX_OUTPUT_CHARS, STREAM_MAX_THINKING_CHARS, STREAM_MAX_SECONDS, BATCH_ENABLED,
+    BATCH_MAX_CATEGORIES, BATCH_MIN_CONTEXT, BATCH_MIN_SECTION_CHARS, MODEL_CONTEXT_WINDOWS,
+    DEFAULT_CONTEXT_WINDOW, LOCAL_SUMMARY_TIER, LOCAL_SUMMARY_MAX_ITEMS, PROMPT_SUMMARY_CHARS,
+    ENRICH_PROMPTS, ENRICH_SUMMARY_CHARS, RATE_LIMIT_ENABLED
+)
+
+SYSTEM_PROMPT = "You are a news generation engine. You enable information flow. You do not converse. You do not plan. You only output the final article text."
+MODEL_PARAMS = {"temperature": 0.3}
+
+# One budget for every concurrent summarization worker
+LIMITER = RateLimiter(BYTEZ_REQUESTS_PER_MINUTE, BYTEZ_TOKENS_PER_MINUTE, RATE_LIMIT_ENABLED)
+
+# Preferred fallback chain; model_router reorders it per request from the
+# persisted success/latency scoreboard
+MODELS = [
+    "anthropic/claude-opus-4-6" ,
+    "Qwen/Qwen3-8B" , 
+    "Qwen/Qwen3-4B-Thinking-2507",
+    "mistralai/Mistral-7B-Instruct-v0.3",
+    "anthropic/claude-opus-4-5", 
+    "openai/gpt-oss-20b" ,
+    "meta-llama/Meta-Llama-3.1-8B-Instruct"
+]
 
 def strip_thinking(text):
     """
@@ -42,19 +75,134 @@ def strip_thinking(text):
     
     return text.strip()
 
-def generate_section_summary(category, articles):
-    if not articles: 
-        return None
+class ThinkFilter:
+    """
+    Incremental strip_thinking for streamed output. Everything before the
+    latest </think> or "--- CUT HERE ---" is dropped as soon as it is seen,
+    and result() matches strip_thinking() on the full text.
+
+    feed() returns False once the stream should stop; `aborted` says why:
+    "runaway reasoning" (thinking past max_thinking_chars, no usable
+    answer) or "output cap" (answer past max_output_chars, kept truncated).
+    """
+    OPEN = "<think>"
+    CLOSE = "</think>"
+    SEPARATOR = "--- CUT HERE ---"
+    LONGEST = len(SEPARATOR)
+
+    def __init__(self, starts_in_think=False, max_output_chars=None, max_thinking_chars=None):
+        # Thinking models (e.g. Qwen3-*-Thinking) often omit the opening tag
+        self.thinking = starts_in_think
+        self.max_output_chars = max_output_chars
+        self.max_thinking_chars = max_thinking_chars
+        self.buffer = ""
+        self.after_cut = False
+        self.thinking_chars = 0
+        self.scan_from = 0
+        self.aborted = None
+
+    def feed(self, chunk):
+        # A marker may straddle the previous chunk boundary
+        pos = max(self.scan_from, len(self.buffer) - self.LONGEST + 1)
+        self.buffer += chunk
+        if self.thinking:
+            self.thinking_chars += len(chunk)
+
+        while True:
+            hits = [(self.buffer.find(marker, pos), marker) for marker in (self.OPEN, self.CLOSE, self.SEPARATOR)]
+            hits = [hit for hit in hits if hit[0] >= 0]
+            if not hits:
+                break
+            index, marker = min(hits)
+            end = index + len(marker)
+            if marker == self.OPEN:
+                # strip_thinking only cuts at the closing tag; the open tag just starts the count
+                if not self.thinking:
+                    self.thinking = True
+                    self.thinking_chars = len(self.buffer) - end
+                pos = self.scan_from = end
+            else:
+                self.buffer = self.buffer[end:]
+                self.thinking = False
+                self.after_cut = marker == self.SEPARATOR
+                pos = self.scan_from = 0
+
+        if self.thinking:
+            if self.max_thinking_chars and self.thinking_chars > self.max_thinking_chars:
+                self.aborted = "runaway reasoning"
+                return False
+        elif self.max_output_chars and len(self.buffer) > self.max_output_chars:
+            self.aborted = "output cap"
+            return False
+        return True
+
+    def result(self):
+        """
+        Returns: the answer text, or "" when the stream ran away while thinking
+        """
+        if self.aborted == "runaway reasoning":
+            return ""
+        if self.after_cut:
+            return self.buffer.strip()
+        return strip_thinking(self.buffer)
+
+# Model citations: <r7|Name>, with tolerance for <[r7]|Name> and bare [r7]
+LINK_REF_PATTERN = re.compile(r'<\s*\[?(r\d+)\]?\s*\|\s*([^>]*?)\s*>|\[(r\d+)\]')
+
+def encode_links(articles, text=None):
+    """
+    Swaps every URL for a short reference ID ([r1], [r2], ...) so the
+    prompt and the model's answer carry IDs instead of long URLs. Slack
+    links in `text` (e.g. a previous summary) are swapped for <rN|Name>.
+    Returns: (articles with IDs in place of links, encoded text, {"r1": url, ...})
+    """
+    refs = {}
+    ids = {}
+
+    def ref_id(url):
+        if url not in ids:
+            ids[url] = f"r{len(ids) + 1}"
+            refs[ids[url]] = url
+        return ids[url]
+
+    encoded = []
+    for article in articles:
+        article = dict(article)
+        article['link'] = f"[{ref_id(article['link'])}]"
+        if article.get('related_links'):
+            article['related_links'] = [f"[{ref_id(url)}]" for url in article['related_links']]
+        encoded.append(article)
+
+    if text:
+        text = re.sub(r'<(https?://[^|>\s]+)\|([^>]*)>', lambda m: f"<{ref_id(m.group(1))}|{m.group(2)}>", text)
+    return encoded, text, refs
+
+def expand_links(text, refs):
+    """
+    Turns reference IDs in a model answer back into Slack <url|Source> links.
+    Unknown IDs keep only their source name.
+    """
+    def expand(match):
+        ref_id = match.group(1) or match.group(3)
+        url = refs.get(ref_id)
+        name = match.group(2) or (article_source({'link': url}) if url else "")
+        if not url:
+            return name
+        return f"<{url}|{name or 'Source'}>"
 
-    # 1. Prepare Content
-    news_content = ""
-    for idx, article in enumerate(articles[:20]): 
-        # Safety: Escape curly braces in titles to prevent f-string errors
-        title = article['title'].replace('{', '{{').replace('}', '}}')
-        link = article['link'].replace('{', '{{').replace('}', '}}')
-        news_content += f"{idx+1}. {title} - {link}\n"
+    return LINK_REF_PATTERN.sub(expand, text) if text else text
 
-    prompt = f"""
+def build_prompt(category, news_content, previous_summary=None):
+    update = ""
+    if previous_summary:
+        update = f"""
+UPDATE MODE: The digest below was already sent earlier. Rewrite it as ONE updated section:
+keep what still stands, fold in the new stories from the raw data, and lead with what changed.
+
+PREVIOUS DIGEST:
+{previous_summary}
+"""
+    return f"""
 ROLE: Senior Intelligence Analyst & Research Director.
 SECTION: {category}
 
@@ -70,123 +218,537 @@ Task: Produce a HIGH-DENSITY Daily Intelligence Digest based on the raw data bel
     -   **The Argument**: Explicitly state the conflict (e.g., "Proponents argue X, while critics warn of Y").
     -   **The Context**: Briefly cite the history or precedent without rambling.
 
-3.  **CITATIONS**: Embed links naturally in the text.
-    -   Start: "Per <URL|The New York Times>, ..."
-    -   End: "...(via <URL|Reuters>)."
+3.  **CITATIONS**: Every story has a reference ID like [r7]. Cite by ID, never write URLs.
+    -   Start: "Per <r7|The New York Times>, ..."
+    -   End: "...(via <r7|Reuters>)."
 
 BEAUTY & FORMATTING GUIDE (Strict Slack Syntax):
 1.  **Headers**: Use emojis. No H1/H2 tags (#).
 2.  **Bold**: Use SINGLE asterisks (*), NOT double (**). 
-3.  **Links**: Use strict Slack syntax: <URL|Source Name>. 
-    -   Correct: <https://example.com|Read Source>
-    -   Wrong: [Read Source](https://example.com)
+3.  **Links**: Use strict Slack syntax with the reference ID: <rN|Source Name>. 
+    -   Correct: <r3|Reuters>
+    -   Wrong: [Reuters](r3)
     -   Wrong: https://example.com
 
 CRITICAL OUTPUT RULES:
 -   Output MUST be dense. Maximum information in minimum space.
 -   Do NOT output your internal "<think>" process.
 -   Output ONLY the final response.
-
+{update}
 RAW DATA:
 {news_content}
 """
 
-    # 2. Call Bytez API
-    MODELS = [
-        "anthropic/claude-opus-4-6" ,
-        "Qwen/Qwen3-8B" , 
-        "Qwen/Qwen3-4B-Thinking-2507",
-        "mistralai/Mistral-7B-Instruct-v0.3",
-        "anthropic/claude-opus-4-5", 
-        "openai/gpt-oss-20b" ,
-        "meta-llama/Meta-Llama-3.1-8B-Instruct"
-    ]
 
+def _enrich(articles):
+    """
+    Full-text enrichment of the top articles when ENRICH_PROMPTS is on.
+    Returns: (articles, summary chars to pack per article)
+    """
+    if not ENRICH_PROMPTS:
+        return articles, PROMPT_SUMMARY_CHARS
+    # newspaper/NLTK are only needed for full-text runs
+    from modules import analyst
+    with metrics.stage("enrich (full text)"):
+        articles = analyst.enrich_articles(articles)
+    return articles, ENRICH_SUMMARY_CHARS
+
+def generate_section_summary(category, articles, previous_summary=None):
+    """
+    Writes one digest section. With previous_summary, `articles` are only
+    the new stories and the model updates the earlier section instead.
+    """
+    if not articles: 
+        return None
+
+    articles, summary_chars = _enrich(articles)
+
+    # 1. Prepare Content: one prompt per model, packed into its context window.
+    # Articles arrive ranked newest-first, so smaller models drop the oldest.
+    # Links travel as short reference IDs and are expanded in the answer.
+    encoded, previous_summary, refs = encode_links(articles, previous_summary)
+    fixed_text = SYSTEM_PROMPT + build_prompt(category, "", previous_summary)
+    prompts = {}
+    for model in MODELS:
+        news_content, _ = prompt_packer.pack_articles(
+            encoded, prompt_packer.article_budget(model, fixed_text), summary_chars=summary_chars
+        )
+        prompts[model] = build_prompt(category, news_content, previous_summary)
+
+    # 2. Call Bytez API
     if not BYTEZ_API_KEY:
         return "⚠️ Bytez API Key Missing"
 
+    # Identical prompts (e.g. a rerun after a Slack/PDF failure) are served
+    # from the response cache without spending tokens
     for model in MODELS:
-        retries = 0
-        max_retries = 3
-        
-        while retries <= max_retries:
-            try:
-                print(f"🤖 Brainstorming {category} with {model} (Attempt {retries+1})...")
-                
-                url = f"https://api.bytez.com/models/v2/{model}"
-                headers = {
-                    "Authorization": BYTEZ_API_KEY,
-                    "Content-Type": "application/json"
-                }
-                
-                payload = {
-                    "messages": [
-                        {
-                            "role": "system", 
-                            "content": "You are a news generation engine. You enable information flow. You do not converse. You do not plan. You only output the final article text." 
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "params": {
-                        "temperature": 0.3 
+        cached = llm_cache.get(llm_cache.cache_key(model, SYSTEM_PROMPT, prompts[model], MODEL_PARAMS))
+        if cached:
+            print(f"💾 {category}: reusing cached {model} response.")
+            return expand_links(strip_thinking(cached), refs)
+    llm_cache.record_miss()
+    metrics.incr("llm.summary_requests")
+
+    chain = model_router.order_models(MODELS)
+    if HEDGE_ENABLED:
+        raw_output = _hedged_call(category, chain, prompts)
+        if raw_output:
+            return expand_links(strip_thinking(raw_output), refs)
+    else:
+        for model in chain:
+            raw_output = _call_model(category, model, prompts[model])
+            if raw_output:
+                # Apply Strip Logic (Safety Net)
+                return expand_links(strip_thinking(raw_output), refs)
+            print("  > Triggering Fallback to next model...")
+
+    return "⚠️ Analysis Failed: All models in hierarchy failed to respond."
+
+
+def _call_model(category, model, prompt, cancel=None, sent=None, sections=1, hedge=False):
+    """
+    Asks one model for the section, retrying on 429s.
+    cancel:   optional threading.Event; once set the call gives up and its
+              response (if any) is discarded
+    sent:     optional dict; sent["at"] is set when the request goes out
+    sections: digest sections requested in this prompt (scales output budgets)
+    hedge:    a backup request racing a slow one (sent on the hedge pool)
+    Returns: raw model output, or None
+    """
+    retries = 0
+    max_retries = 3
+    
+    while retries <= max_retries:
+        if cancel is not None and cancel.is_set():
+            return None
+        started = time.perf_counter()
+        response = None
+        try:
+            print(f"🤖 Brainstorming {category} with {model} (Attempt {retries+1})...")
+            
+            url = f"https://api.bytez.com/models/v2/{model}"
+            headers = {
+                "Authorization": BYTEZ_API_KEY,
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "messages": [
+                    {
+                        "role": "system", 
+                        "content": SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
                     }
-                }
+                ],
+                "params": MODEL_PARAMS
+            }
+            if BYTEZ_STREAM:
+                payload["stream"] = True
 
-                # Intense timeout for Deep Research Papers
-                response = requests.post(url, headers=headers, json=payload, timeout=300)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "output" in data and data["output"]:
-                        # 1. Extract Main Content
-                        raw_output = data["output"]["content"]
-                        
-                        # 2. Apply Strip Logic (Safety Net)
-                        return strip_thinking(raw_output)
-                    else:
-                        print(f"  > Empty output from {model}. Moving to next model...")
-                        break 
-
-                elif response.status_code == 429:
-                    print("  > Rate limited (429). Sleeping 60s before retry...")
-                    time.sleep(60)
-                    retries += 1
-                    continue 
+            # Wait for our share of the requests/tokens-per-minute quota
+            LIMITER.acquire(estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS * sections)
+            # A hedge may have been decided while we waited for quota
+            if cancel is not None and cancel.is_set():
+                return None
 
+            # Intense timeout for Deep Research Papers
+            started = time.perf_counter()
+            if sent is not None:
+                sent["at"] = started
+            # Hedged calls stream, so a cancelled loser's body is never downloaded
+            extra = {"stream": True} if cancel is not None or BYTEZ_STREAM else {}
+            response = http_client.post(
+                replay.route(url), headers=headers, json=payload,
+                timeout=(BYTEZ_CONNECT_TIMEOUT, BYTEZ_READ_TIMEOUT), hedge=hedge, **extra
+            )
+            if cancel is not None and cancel.is_set():
+                response.close()
+                return None
+            # Streamed answers arrive as plain text; errors still come back as JSON
+            streamed = (
+                BYTEZ_STREAM and response.status_code == 200
+                and not response.headers.get("Content-Type", "").startswith("application/json")
+            )
+            if replay.is_recording() and not streamed:
+                replay.record_bytez(model, payload, response.status_code, response.text)
+            latency = time.perf_counter() - started
+            prompt_tokens = estimate_tokens(prompt)
+            metrics.incr("llm.prompt_tokens", prompt_tokens)
+            metrics.add_timing("llm.request", latency)
+            print(f"  > {model}: ~{prompt_tokens} prompt tokens, HTTP {response.status_code} in {latency:.1f}s")
+            
+            if response.status_code == 200:
+                if streamed:
+                    raw_output, raw_text = _read_stream(model, response, started, cancel, sections)
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    latency = time.perf_counter() - started
+                    if raw_text is not None:
+                        replay.record_bytez(model, payload, 200, json.dumps(
+                            {"error": None, "output": {"role": "assistant", "content": raw_text}}, ensure_ascii=False
+                        ))
+                else:
+                    data = response.json()
+                    response.close()
+                    raw_output = data["output"]["content"] if data.get("output") else None
+                if raw_output:
+                    model_router.record_result(model, model_router.SUCCESS, latency)
+                    llm_cache.put(
+                        llm_cache.cache_key(model, SYSTEM_PROMPT, prompt, MODEL_PARAMS), model, raw_output
+                    )
+                    return raw_output
                 else:
-                    print(f"  > Error from {model} ({response.status_code}): {response.text}")
-                    break 
+                    model_router.record_result(model, model_router.EMPTY, latency)
+                    print(f"  > Empty output from {model}. Moving to next model...")
+                    return None
 
-            except Exception as e:
-                print(f"  > Exception with {model}: {e}")
-                break 
-            
+            elif response.status_code == 429:
+                # Streamed requests hold their pooled connection until closed
+                response.close()
+                model_router.record_result(model, model_router.RATE_LIMITED, latency)
+                delay = backoff_delay(retries, parse_retry_after(response.headers.get("Retry-After")))
+                print(f"  > Rate limited (429). Backing off {delay:.1f}s before retry...")
+                # Every worker shares the quota, so all of them hold off
+                LIMITER.pause(delay)
+                retries += 1
+                continue 
+
+            else:
+                model_router.record_result(model, model_router.ERROR, latency)
+                print(f"  > Error from {model} ({response.status_code}): {response.text}")
+                response.close()
+                return None
+
+        except Exception as e:
+            if response is not None:
+                response.close()
+            model_router.record_result(model, model_router.ERROR, time.perf_counter() - started)
+            print(f"  > Exception with {model}: {e}")
+            return None
+
+    return None
+
+
+def _read_stream(model, response, started, cancel=None, sections=1):
+    """
+    Consumes a streamed completion through ThinkFilter, enforcing the
+    per-section output and time caps.
+    Returns: (answer or None, full raw text when recording else None)
+    """
+    thinker = ThinkFilter(
+        starts_in_think="thinking" in model.lower(),
+        max_output_chars=STREAM_MAX_OUTPUT_CHARS * sections,
+        max_thinking_chars=STREAM_MAX_THINKING_CHARS
+    )
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    raw_parts = [] if replay.is_recording() else None
+    first_byte = None
+    try:
+        for data in response.iter_content(chunk_size=None):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+                metrics.add_timing("llm.ttfb", first_byte - started)
+            chunk = decoder.decode(data)
+            if raw_parts is not None:
+                raw_parts.append(chunk)
+            if not thinker.feed(chunk) or (cancel is not None and cancel.is_set()):
+                break
+            if time.perf_counter() - started > STREAM_MAX_SECONDS * sections:
+                thinker.aborted = "time cap"
+                break
+        else:
+            thinker.feed(decoder.decode(b"", final=True))
+    finally:
+        response.close()
+
+    if thinker.aborted:
+        metrics.incr("llm.stream_aborts")
+        print(f"  > Stopped {model} stream early ({thinker.aborted}, "
+              f"{thinker.thinking_chars} reasoning chars dropped).")
+    answer = thinker.result()
+    if thinker.aborted == "time cap" and thinker.thinking:
+        answer = ""
+    return answer or None, "".join(raw_parts) if raw_parts is not None else None
+
+def _hedge_delay(model):
+    observed = model_router.latency_percentile(model, HEDGE_PERCENTILE)
+    return max(HEDGE_MIN_DELAY, HEDGE_DEFAULT_DELAY if observed is None else observed)
+
+_hedge_lock = threading.Lock()
+
+def _reserve_hedge(tokens):
+    """
+    Charges one hedge against this run's caps (HEDGE_MAX_RATE of summary
+    requests, HEDGE_MAX_TOKENS estimated tokens).
+    Returns: True if the hedge may go ahead
+    """
+    with _hedge_lock:
+        counters = metrics.snapshot()["counters"]
+        allowed_hedges = max(1, int(HEDGE_MAX_RATE * counters.get("llm.summary_requests", 0)))
+        if counters.get("llm.hedges", 0) >= allowed_hedges:
+            metrics.incr("llm.hedges_capped")
+            return False
+        if counters.get("llm.hedge_tokens", 0) + tokens > HEDGE_MAX_TOKENS:
+            metrics.incr("llm.hedges_capped")
+            return False
+        metrics.incr("llm.hedges")
+        metrics.incr("llm.hedge_tokens", tokens)
+        return True
+
+def _hedged_call(category, chain, prompts):
+    """
+    Walks the fallback chain, but when the running model is slower than its
+    hedge delay the next model is started alongside it. The first valid
+    answer wins; the other call is cancelled.
+    Returns: raw model output, or None if every model failed
+    """
+    chain = list(chain)
+    cancel = threading.Event()
+    results = queue.Queue()
+    running = 0
+
+    def launch(hedge=False):
+        nonlocal running
+        model = chain.pop(0)
+        sent = {}
+
+        def run():
+            try:
+                raw_output = _call_model(category, model, prompts[model], cancel, sent, hedge=hedge)
+            except Exception:
+                raw_output = None
+            results.put((model, raw_output))
+
+        # Daemon threads: an abandoned call must not hold up interpreter exit
+        threading.Thread(target=run, name=f"bytez-{model}", daemon=True).start()
+        running += 1
+        return model, sent
+
+    primary, sent = launch()
+    hedged = False
+    while running:
+        timeout = None
+        if not hedged and chain:
+            if "at" in sent:
+                timeout = max(0.0, sent["at"] + _hedge_delay(primary) - time.perf_counter())
+            else:
+                timeout = 1.0  # Still waiting for its rate-limit slot
+
+        try:
+            model, raw_output = results.get(timeout=timeout)
+        except queue.Empty:
+            if "at" in sent and sent["at"] + _hedge_delay(primary) <= time.perf_counter():
+                hedged = True
+                if _reserve_hedge(estimate_tokens(prompts[chain[0]]) + EXPECTED_OUTPUT_TOKENS):
+                    print(f"  > {primary} slower than {_hedge_delay(primary):.0f}s; hedging with {chain[0]}...")
+                    launch(hedge=True)
+            continue
+
+        running -= 1
+        if raw_output:
+            cancel.set()
+            if model != primary:
+                metrics.incr("llm.hedge_wins")
+            return raw_output
+        if not running and chain:
+            print("  > Triggering Fallback to next model...")
+            primary, sent = launch()
+            hedged = False
+
+    return None
+
+
+BATCH_INSTRUCTIONS = """
+MULTI-SECTION OUTPUT: The raw data holds {count} sections, each under a "=== SECTION: name ===" line.
+Write one complete digest per section, in the same order. Start each one with the line
+### SECTION: <exact section name>
+and never mix stories between sections.
+"""
+
+# "### SECTION: name", tolerating bold/heading/rule decoration around it
+SECTION_HEADER = re.compile(r'^[ \t>*#_=-]*SECTION:\s*(.+?)[\s*_#=-]*$', re.MULTILINE | re.IGNORECASE)
+
+def _section_name(text):
+    # Compare names without emoji, punctuation or case
+    return re.sub(r'[\W_]+', ' ', text).strip().casefold()
+
+def split_sections(text, categories):
+    """
+    Maps a multi-section answer back to its categories. Sections that are
+    missing, unrecognised, repeated or too short to be a digest are left out.
+    Returns: dict { category: section text }
+    """
+    wanted = {_section_name(category): category for category in categories}
+    headers = list(SECTION_HEADER.finditer(text or ""))
+    sections = {}
+    for i, match in enumerate(headers):
+        # Exact names only: one category's name may contain another's
+        category = wanted.get(_section_name(match.group(1)))
+        if not category or category in sections:
+            continue
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        # Drop rules (---) the model put between sections
+        body = re.sub(r'(\n[ \t]*[-=_*]{3,}[ \t]*)+$', '', text[match.end():end].strip())
+        if len(body) >= BATCH_MIN_SECTION_CHARS:
+            sections[category] = body
+    return sections
+
+def generate_batch_summary(batch):
+    """
+    Writes several sections with one request to a large-context model.
+    batch: dict { category: articles } (each non-empty)
+    Returns: dict { category: summary } for the sections that came back intact
+    """
+    categories = list(batch)
+    models = [
+        model for model in model_router.order_models(MODELS)
+        if MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW) >= BATCH_MIN_CONTEXT
+    ]
+    if not models or not BYTEZ_API_KEY:
+        return {}
+
+    # Enriched per category, so each section gets its own top articles
+    batch = dict(batch)
+    summary_chars = PROMPT_SUMMARY_CHARS
+    for category in categories:
+        batch[category], summary_chars = _enrich(batch[category])
+
+    # One reference table for the whole batch, so IDs stay unique across sections
+    flat = [article for category in categories for article in batch[category]]
+    encoded, _, refs = encode_links(flat)
+    label = f"{len(categories)} sections ({', '.join(categories)})"
+    fixed_text = SYSTEM_PROMPT + build_prompt(label, "") + BATCH_INSTRUCTIONS
+
+    missed = False
+    for model in models:
+        per_section = prompt_packer.article_budget(model, fixed_text) // len(categories)
+        blocks = []
+        offset = 0
+        for category in categories:
+            count = len(batch[category])
+            news_content, _ = prompt_packer.pack_articles(
+                encoded[offset:offset + count], per_section, summary_chars=summary_chars
+            )
+            offset += count
+            blocks.append(f"=== SECTION: {category} ===\n{news_content}")
+        prompt = build_prompt(label, "\n".join(blocks)) + BATCH_INSTRUCTIONS.format(count=len(categories))
+
+        cached = llm_cache.get(llm_cache.cache_key(model, SYSTEM_PROMPT, prompt, MODEL_PARAMS))
+        # One miss per batch, like one per category on the single-section path
+        if not cached and not missed:
+            llm_cache.record_miss()
+            missed = True
+        raw_output = cached or _call_model(label, model, prompt, sections=len(categories))
+        if raw_output:
+            metrics.incr("llm.batched_requests")
+            break
         print("  > Triggering Fallback to next model...")
+    else:
+        return {}
 
-    return "⚠️ Analysis Failed: All models in hierarchy failed to respond."
+    # Drop reasoning first; strip_thinking's header search would eat the first marker
+    if '</think>' in raw_output:
+        raw_output = raw_output.split('</think>')[-1]
+    sections = split_sections(raw_output, categories)
+    return {category: expand_links(strip_thinking(text), refs) for category, text in sections.items()}
 
+def summarize_batched(categorized_news):
+    """
+    Batches the non-empty categories BATCH_MAX_CATEGORIES at a time.
+    Returns: dict { category: summary } for the sections that came back;
+    the caller summarizes the rest one by one.
+    """
+    active = [category for category, articles in categorized_news.items() if articles]
+    batches = [
+        {category: categorized_news[category] for category in active[i:i + BATCH_MAX_CATEGORIES]}
+        for i in range(0, len(active), BATCH_MAX_CATEGORIES)
+    ]
+    # A single category gains nothing from batching
+    batches = [batch for batch in batches if len(batch) > 1]
+
+    summaries = {}
+    with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as pool:
+        for batch, result in zip(batches, pool.map(generate_batch_summary, batches)):
+            summaries.update(result)
+            missing = [category for category in batch if category not in result]
+            if missing:
+                metrics.incr("llm.batch_retries", len(missing))
+                print(f"  > Batch answer missing {', '.join(missing)}; retrying individually.")
+    return summaries
+
+def local_summary(category, articles):
+    """
+    Extractive section built on this machine (no network, milliseconds).
+    """
+    # Imported here: numpy is only loaded when the local tier actually runs
+    from modules import summarizer
+
+    with metrics.stage("summarize (local)"):
+        summary = summarizer.summarize_section(articles, LOCAL_SUMMARY_MAX_ITEMS)
+    metrics.incr("llm.local_summaries")
+    return summary
+
+def summarize_category(category, articles):
+    """
+    Summarizes a single category. The local extractive summarizer is the
+    first tier (LOCAL_SUMMARY_TIER="first") or the last resort ("last")
+    when every model failed.
+    Returns: summary string
+    """
+    if LOCAL_SUMMARY_TIER == "first":
+        return local_summary(category, articles)
+
+    summary = None
+    if INCREMENTAL_ENABLED:
+        previous_summary, covered_ids = summary_state.previous(category)
+        if previous_summary:
+            new_articles = [a for a in articles if (a.get('id') or a.get('link')) not in covered_ids]
+            if not new_articles:
+                print(f"⏭️ {category}: nothing new since the last digest; reusing it.")
+                metrics.incr("llm.incremental_skips")
+                return previous_summary
+            print(f"🔁 {category}: updating the last digest with {len(new_articles)} new articles.")
+            metrics.incr("llm.incremental_updates")
+            summary = generate_section_summary(category, new_articles, previous_summary)
+
+    if not articles:
+        return "No major updates in this sector today."
+
+    if summary is None:
+        summary = generate_section_summary(category, articles)
+    if LOCAL_SUMMARY_TIER == "last" and summary.startswith("⚠️"):
+        print(f"🧮 {category}: no model answered; using the local extractive summary.")
+        return local_summary(category, articles)
+    return summary
+
+def batching_active():
+    """
+    Incremental updates carry a per-category prior summary, so they are
+    never batched; a local-first run makes no Bytez requests at all.
+    Returns: True if summarize_news sends batched requests
+    """
+    return BATCH_ENABLED and not INCREMENTAL_ENABLED and LOCAL_SUMMARY_TIER != "first"
 
 def summarize_news(categorized_news):
     """
-    Orchestrates the summarization for ALL categories.
+    Orchestrates the summarization for ALL categories, SUMMARY_WORKERS at a
+    time; the shared rate limiter keeps the combined load within quota.
     Returns dict: { "Category": "Summary String" }
     """
-    ai_report = {}
-    
     print("--- Generating AI Magazine Content ---")
-    for category, articles in categorized_news.items():
-        if articles:
-            summary = generate_section_summary(category, articles)
-            if summary:
-                ai_report[category] = summary
-                
-                # SAFETY: 10s sleep to prevent Token Rate Limiting (TPM) on Deep Dives
-                print("  > 10s Token Cooldown...")
-                time.sleep(10)
-        else:
-            ai_report[category] = "No major updates in this sector today."
+    batched = {}
+    if batching_active():
+        batched = summarize_batched(categorized_news)
+    elif BATCH_ENABLED:
+        print("  > Batching does not apply to incremental or local-first runs; summarizing one by one.")
+
+    remaining = [category for category in categorized_news if category not in batched]
+    with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as pool:
+        summaries = pool.map(summarize_category, remaining, [categorized_news[c] for c in remaining])
+        ai_report = dict(zip(remaining, summaries))
+    ai_report.update(batched)
             
-    return ai_report
+    return {category: ai_report[category] for category in categorized_news}
@@ -1,13 +1,203 @@
-from newspaper import Article
-import nltk
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from config import (
+    ANALYST_CACHE_DIR, ANALYST_CACHE_TTL_DAYS, ANALYST_DOWNLOAD_WORKERS, ANALYST_PER_DOMAIN,
+    ANALYST_DOMAIN_DELAY, ANALYST_PARSE_WORKERS, ANALYST_MAX_TEXT_CHARS, ENRICH_TOP_N
+)
+from modules import http_client, metrics, replay
+from modules.dedup import canonicalize_url
 
-# Ensure NLTK data is present (idempotent)
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-    nltk.download('punkt_tab', quiet=True)
+# Tokenizer data newspaper's nlp() needs; fetched by provision_nltk_data()
+NLTK_RESOURCES = ("punkt", "punkt_tab")
+
+ARTICLE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+}
+
+class _DomainLimiter:
+    """
+    Politeness per site: at most `per_domain` downloads at once, started
+    at least `delay` seconds apart.
+    """
+
+    def __init__(self, per_domain, delay):
+        self.per_domain = per_domain
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.next_start = {}
+
+    @contextmanager
+    def slot(self, host):
+        with self.lock:
+            semaphore = self.slots.setdefault(host, threading.Semaphore(self.per_domain))
+        with semaphore:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_start.get(host, 0.0))
+                self.next_start[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+_domains = _DomainLimiter(ANALYST_PER_DOMAIN, ANALYST_DOMAIN_DELAY)
+
+_pool_lock = threading.Lock()
+_parse_pool = None
+
+def _get_parse_pool():
+    global _parse_pool
+    with _pool_lock:
+        if _parse_pool is None:
+            # Created from worker threads mid-run: forking a multithreaded
+            # process can deadlock the child, so workers are spawned fresh
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=ANALYST_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+# -------------------------------------------------------------------------
+# Disk cache: one JSON file per canonical URL
+# -------------------------------------------------------------------------
+
+def _cache_path(url):
+    key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+    return os.path.join(ANALYST_CACHE_DIR, key + ".json")
+
+def _cache_get(url):
+    try:
+        with open(_cache_path(url), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry["created"] >= time.time() - ANALYST_CACHE_TTL_DAYS * 86400:
+            return entry["result"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+def _cache_put(url, result):
+    try:
+        os.makedirs(ANALYST_CACHE_DIR, exist_ok=True)
+        path = _cache_path(url)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "created": time.time(), "result": result}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Error writing article cache: {e}")
+
+# -------------------------------------------------------------------------
+# Extraction
+# -------------------------------------------------------------------------
+
+def provision_nltk_data():
+    """
+    Downloads the NLTK tokenizer data if it is missing (idempotent).
+    Run once as a setup step (`python -m modules.analyst --setup`), never
+    at import time, so a cold start doesn't touch the network.
+    Returns: True when the data is available
+    """
+    try:
+        import nltk
+    except ImportError:
+        print("nltk is not installed; full-text extraction is unavailable.")
+        return False
+
+    ok = True
+    for resource in NLTK_RESOURCES:
+        try:
+            nltk.data.find(f"tokenizers/{resource}")
+        except LookupError:
+            print(f"Downloading NLTK data: {resource}")
+            ok = nltk.download(resource, quiet=True) and ok
+    return ok
+
+def _extract(url, html):
+    """
+    Parse + NLP of one downloaded page. Runs in a worker process.
+    """
+    # Imported here: newspaper (and nltk behind it) only loads in the
+    # worker processes, and only when full-text extraction is used
+    from newspaper import Article
+
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+
+    # NLP processing (Keyword extraction + Summarization)
+    article.nlp()
+
+    # We want a "PhD Professor" level detail, so we take a longer summary
+    # If the generated summary is too short, we might take the first few paragraphs manually.
+    summary = article.summary
+
+    # Fallback if nlp() returns nothing
+    if not summary or len(summary) < 50:
+        # Take the first 1500 chars roughly (~3 paragraphs)
+        summary = article.text[:1500] + "..."
+
+    return {
+        "title": article.title,
+        "summary": summary,
+        "text": article.text[:ANALYST_MAX_TEXT_CHARS],
+        "top_image": article.top_image,
+        "authors": article.authors,
+        "publish_date": str(article.publish_date)
+    }
+
+def _download(url):
+    with _domains.slot(urlsplit(url).hostname or ""):
+        response = http_client.get(replay.route(url), headers=ARTICLE_HEADERS)
+    response.raise_for_status()
+    return response.text
+
+def analyze_batch(urls):
+    """
+    Full-text extraction for many URLs. Cached results are served from
+    disk; the rest are downloaded concurrently (politely per domain) and
+    parsed in a process pool as each page arrives.
+    Returns: dict { url: {title, summary, text, top_image, authors, publish_date} or None }
+    """
+    results = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = _cache_get(url)
+        if cached:
+            metrics.incr("analyst.cache_hits")
+            results[url] = cached
+        else:
+            pending.append(url)
+    if not pending:
+        return results
+
+    parse_pool = _get_parse_pool()
+    parsing = {}
+    with ThreadPoolExecutor(max_workers=ANALYST_DOWNLOAD_WORKERS) as pool:
+        downloads = {pool.submit(_download, url): url for url in pending}
+        for future in as_completed(downloads):
+            url = downloads[future]
+            try:
+                parsing[parse_pool.submit(_extract, url, future.result())] = url
+            except Exception as e:
+                print(f"Error downloading {url}: {e}")
+                results[url] = None
+
+    for future, url in parsing.items():
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error analyzing {url}: {e}")
+            result = None
+        if result:
+            metrics.incr("analyst.extracted")
+            _cache_put(url, result)
+        results[url] = result
+    return {url: results.get(url) for url in dict.fromkeys(urls)}
 
 def analyze_and_summarize(url, sentence_limit=10):
     """
@@ -18,36 +208,30 @@ def analyze_and_summarize(url, sentence_limit=10):
         text (str): The full text (optional)
         top_image (str): URL to main image
     """
-    try:
-        article = Article(url)
-        article.download()
-        article.parse()
-        
-        # NLP processing (Keyword extraction + Summarization)
-        article.nlp()
-        
-        # We want a "PhD Professor" level detail, so we take a longer summary
-        # If the generated summary is too short, we might take the first few paragraphs manually.
-        summary = article.summary
-        
-        # Fallback if nlp() returns nothing
-        if not summary or len(summary) < 50:
-            # Take the first 1500 chars roughly (~3 paragraphs)
-            summary = article.text[:1500] + "..."
-            
-        return {
-            "title": article.title,
-            "summary": summary,
-            "top_image": article.top_image,
-            "authors": article.authors,
-            "publish_date": str(article.publish_date)
-        }
-
-    except Exception as e:
-        print(f"Error analyzing {url}: {e}")
-        return None
+    return analyze_batch([url]).get(url)
+
+def enrich_articles(articles, top_n=ENRICH_TOP_N):
+    """
+    Swaps the RSS summary of the top_n highest-ranked articles for the
+    summary extracted from the full article.
+    Returns: list of (copied) article dicts
+    """
+    extracted = analyze_batch([article['link'] for article in articles[:top_n]])
+    enriched = []
+    for article in articles:
+        result = extracted.get(article['link'])
+        if result and result.get('summary'):
+            article = dict(article, summary=result['summary'])
+        enriched.append(article)
+    return enriched
 
 if __name__ == "__main__":
+    import sys
+    if "--setup" in sys.argv:
+        # Setup failures are reported, not fatal: the digest runs without full text
+        provision_nltk_data()
+        sys.exit(0)
+
     # Test on a heavy article
     url = "https://www.reuters.com/world/asia-pacific/"
     print(analyze_and_summarize(url))
@@ -0,0 +1,134 @@
+import hashlib
+import re
+from config import CLUSTER_ENABLED, CLUSTER_MAX_HAMMING
+
+# Words that carry no story identity; dropping them sharpens the fingerprint
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'she', 'that',
+    'the', 'their', 'they', 'this', 'to', 'was', 'were', 'will', 'with',
+    'after', 'over', 'says', 'said', 'new', 'post', 'appeared', 'first'
+}
+TAG_PATTERN = re.compile(r'<[^>]+>')
+# Any script: Urdu or CJK headlines must fingerprint too
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)?", re.UNICODE)
+
+FINGERPRINT_BITS = 64
+
+def _features(article):
+    """
+    Weighted shingles for an article: title words count double, and
+    adjacent-word pairs capture phrasing that single words miss.
+    """
+    title = article.get('title', '') or ''
+    summary = TAG_PATTERN.sub(' ', article.get('summary', '') or '')
+
+    features = {}
+    for text, weight in ((title, 2), (summary[:600], 1)):
+        words = [w for w in WORD_PATTERN.findall(text.lower()) if w not in STOP_WORDS]
+        for word in words:
+            features[word] = features.get(word, 0) + weight
+        for pair in zip(words, words[1:]):
+            key = ' '.join(pair)
+            features[key] = features.get(key, 0) + weight
+    return features
+
+def _feature_hash(feature):
+    # Stable across runs (the builtin hash() is salted per process)
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(article):
+    """
+    64-bit SimHash of an article's title + summary.
+    Returns: fingerprint, or None when the text yields no features (every
+    such article would otherwise share fingerprint 0)
+    """
+    features = _features(article)
+    if not features:
+        return None
+    weights = [0] * FINGERPRINT_BITS
+    for feature, weight in features.items():
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if h >> bit & 1:
+                weights[bit] += weight
+            else:
+                weights[bit] -= weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def cluster_articles(articles, max_hamming=CLUSTER_MAX_HAMMING):
+    """
+    Groups near-duplicate articles of one category.
+    Fingerprints are split into max_hamming + 1 bands; by the pigeonhole
+    principle any two fingerprints within max_hamming bits share a band,
+    so only articles colliding in a band bucket are compared.
+    Returns: list of representatives (first article of each cluster, in
+    input order) with the other members' links in 'related_links'.
+    """
+    if len(articles) < 2:
+        return [dict(a) for a in articles]
+
+    fingerprints = [simhash(a) for a in articles]
+    parent = list(range(len(articles)))
+
+    bands = max_hamming + 1
+    band_bits = FINGERPRINT_BITS // bands
+    band_mask = (1 << band_bits) - 1
+
+    for band in range(bands):
+        shift = band * band_bits
+        buckets = {}
+        for i, fp in enumerate(fingerprints):
+            # Featureless articles stay singletons
+            if fp is None:
+                continue
+            buckets.setdefault((fp >> shift) & band_mask, []).append(i)
+
+        for members in buckets.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if bin(fingerprints[i] ^ fingerprints[j]).count('1') <= max_hamming:
+                        root_i, root_j = _find(parent, i), _find(parent, j)
+                        if root_i != root_j:
+                            # Keep the earliest article as the cluster root
+                            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters = {}
+    for i in range(len(articles)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+
+    representatives = []
+    for root in sorted(clusters):
+        rep = dict(articles[root])
+        related = [articles[i]['link'] for i in clusters[root] if i != root]
+        if related:
+            rep['related_links'] = related
+        representatives.append(rep)
+    return representatives
+
+def cluster_stories(categorized_news):
+    """
+    Collapses near-duplicate stories in every category before summarization.
+    Returns: dict { "Category": [representative articles] }
+    """
+    if not CLUSTER_ENABLED:
+        return categorized_news
+
+    clustered = {}
+    for category, articles in categorized_news.items():
+        clustered[category] = cluster_articles(articles)
+        merged = len(articles) - len(clustered[category])
+        if merged:
+            print(f"  > {category}: merged {merged} near-duplicate stories.")
+    return clustered
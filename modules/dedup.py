@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config import DEDUP_INDEX_PATH, DEDUP_TTL_DAYS
+
+# Query parameters that only identify the referrer/campaign, never the story
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'cmpid', 'cmp', 'ocid', 'smid', 'smtyp', 'taid', 'ref', 'ref_src',
+    'mod', 'ito'
+}
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_', '__twitter')
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url):
+    """
+    Normalizes an article URL so the same story maps to one key:
+    https scheme, lowercase host without 'www.', no default port, no
+    trailing slash, no fragment, tracking params removed, query sorted.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    while path.endswith("/") and len(path) > 1:
+        path = path[:-1]
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(k)
+    ]
+    query.sort()
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def load_index():
+    """
+    Loads the persisted dedup index, dropping entries older than the TTL.
+    Returns: dict { canonical_url: last_sent_timestamp }
+    """
+    cutoff = time.time() - DEDUP_TTL_DAYS * 86400
+    try:
+        if os.path.exists(DEDUP_INDEX_PATH):
+            with open(DEDUP_INDEX_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return {k: v for k, v in data.items() if v >= cutoff}
+    except Exception as e:
+        print(f"Error loading dedup index: {e}")
+    return {}
+
+def save_index(index):
+    try:
+        os.makedirs(os.path.dirname(DEDUP_INDEX_PATH), exist_ok=True)
+        tmp_path = DEDUP_INDEX_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, DEDUP_INDEX_PATH)
+    except Exception as e:
+        print(f"Error saving dedup index: {e}")
+
+def mark_covered(categorized_news):
+    """
+    Records every article in the report as covered, so later runs skip it.
+    Call this only after the digest was delivered, so a failed run can be
+    retried with the same stories.
+    """
+    index = load_index()
+    now = time.time()
+    for articles in categorized_news.values():
+        for article in articles:
+            key = article.get('id') or canonicalize_url(article.get('link'))
+            if key:
+                index[key] = now
+            # Near-duplicates folded into this story by clustering
+            for link in article.get('related_links', []):
+                index[canonicalize_url(link)] = now
+    save_index(index)
+    print(f"  > Dedup index now tracks {len(index)} stories.")
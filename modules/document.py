@@ -0,0 +1,80 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Paragraph kinds
+TEXT = "text"
+HEADLINE = "headline"   # numbered or starred item ("1. ...", "*Title* ...")
+HEADING = "heading"     # Markdown header ("### ...")
+
+# Span kinds
+PLAIN = "plain"
+BOLD = "bold"
+LINK = "link"
+
+# gap: blank lines before the paragraph in the source
+# indent: the line's leading whitespace (nested bullets), for Slack
+Paragraph = namedtuple("Paragraph", "kind spans gap indent")
+# url is None except for links
+Span = namedtuple("Span", "kind text url")
+
+# Everything inline, in one alternation so each line is scanned once.
+# Slack links first (the models are asked for them), then Markdown links,
+# **bold** before *bold*.
+INLINE_PATTERN = re.compile(
+    r'<(?P<slack_url>[^|<>]+)\|(?P<slack_text>[^>]+)>'
+    r'|\[(?P<md_text>[^\]]+)\]\((?P<md_url>https?://[^)]+)\)'
+    r'|\*\*(?P<strong>[^*\n]+)\*\*'
+    r'|\*(?P<bold>[^*\n]+)\*'
+)
+HEADING_PATTERN = re.compile(r'#{1,6}\s+')
+HEADLINE_PATTERN = re.compile(r'\d+\.|\*')
+
+def parse_inline(line):
+    """
+    Returns: tuple of Spans for one line of text
+    """
+    spans = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(line):
+        if match.start() > position:
+            spans.append(Span(PLAIN, line[position:match.start()], None))
+        if match.group('slack_url'):
+            spans.append(Span(LINK, match.group('slack_text'), match.group('slack_url')))
+        elif match.group('md_url'):
+            spans.append(Span(LINK, match.group('md_text'), match.group('md_url')))
+        else:
+            spans.append(Span(BOLD, match.group('strong') or match.group('bold'), None))
+        position = match.end()
+    if position < len(line):
+        spans.append(Span(PLAIN, line[position:], None))
+    return tuple(spans)
+
+@lru_cache(maxsize=64)
+def parse(text):
+    """
+    Tokenizes a section summary (LLM output: Slack mrkdwn mixed with some
+    Markdown) into paragraphs of plain, bold and link spans. Cached, so the
+    Slack and PDF renderers share one parse of each summary.
+    Returns: tuple of Paragraphs
+    """
+    paragraphs = []
+    gap = 0
+    for line in (text or "").split('\n'):
+        indent = line[:len(line) - len(line.lstrip())]
+        line = line.strip()
+        if not line:
+            gap += 1
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            kind = HEADING
+            line = line[heading.end():]
+        elif HEADLINE_PATTERN.match(line):
+            kind = HEADLINE
+        else:
+            kind = TEXT
+        paragraphs.append(Paragraph(kind, parse_inline(line), gap, indent))
+        gap = 0
+    return tuple(paragraphs)
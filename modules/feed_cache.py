@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+import time
+from config import FEED_CACHE_PATH
+
+# fetch_feed runs on a thread pool, so writes into the shared dict are serialized
+_lock = threading.Lock()
+
+def load_feed_cache():
+    """
+    Loads the HTTP validator cache from disk.
+    Returns: dict { feed_url: {etag, last_modified, articles, fetched_at} }
+    """
+    try:
+        if os.path.exists(FEED_CACHE_PATH):
+            with open(FEED_CACHE_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"Error loading feed cache: {e}")
+    return {}
+
+def save_feed_cache(cache, keep_urls=None):
+    """
+    Writes the cache atomically. If keep_urls is given, entries for feeds
+    that were removed from config are pruned.
+    """
+    with _lock:
+        if keep_urls is not None:
+            keep = set(keep_urls)
+            cache = {url: entry for url, entry in cache.items() if url in keep}
+        try:
+            os.makedirs(os.path.dirname(FEED_CACHE_PATH), exist_ok=True)
+            tmp_path = FEED_CACHE_PATH + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_path, FEED_CACHE_PATH)
+        except Exception as e:
+            print(f"Error saving feed cache: {e}")
+
+def conditional_headers(cache, feed_url):
+    """
+    Returns the If-None-Match / If-Modified-Since headers for a cached feed.
+    """
+    entry = cache.get(feed_url)
+    if not entry:
+        return {}
+
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def cached_articles(cache, feed_url):
+    """
+    Returns a copy of the articles parsed on the last 200 response, or None.
+    """
+    entry = cache.get(feed_url)
+    if not entry or not isinstance(entry.get('articles'), list):
+        return None
+    return [dict(article) for article in entry['articles']]
+
+def store_response(cache, feed_url, response, articles):
+    """
+    Remembers the validators of a fresh response alongside its parsed articles.
+    Responses without validators are not cached (nothing to revalidate with).
+    """
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        with _lock:
+            cache.pop(feed_url, None)
+        return
+
+    with _lock:
+        cache[feed_url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'articles': articles,
+            'fetched_at': time.time()
+        }
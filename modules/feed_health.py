@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from config import (
+    FEED_HEALTH_PATH, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN_HOURS, CIRCUIT_MAX_COOLDOWN_HOURS
+)
+
+# Latency samples kept per feed for percentile estimates
+MAX_SAMPLES = 50
+
+# Feeds record their stats from the fetch thread pool
+_lock = threading.Lock()
+
+def load_health():
+    """
+    Loads per-feed health stats.
+    Returns: dict { feed_url: {...stats...} }
+    """
+    try:
+        if os.path.exists(FEED_HEALTH_PATH):
+            with open(FEED_HEALTH_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"Error loading feed health: {e}")
+    return {}
+
+def save_health(health):
+    with _lock:
+        try:
+            os.makedirs(os.path.dirname(FEED_HEALTH_PATH), exist_ok=True)
+            tmp_path = FEED_HEALTH_PATH + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(health, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, FEED_HEALTH_PATH)
+        except Exception as e:
+            print(f"Error saving feed health: {e}")
+
+def _stats(health, feed_url):
+    return health.setdefault(feed_url, {
+        'runs': 0,
+        'successes': 0,
+        'failures': 0,
+        'consecutive_failures': 0,
+        'bozo': 0,
+        'latencies': [],
+        'total_seconds': 0.0,
+        'useful_articles': 0,
+        'last_success': None,
+        'last_error': None,
+        'open_until': 0
+    })
+
+def _add_latency(stats, latency):
+    stats['latencies'] = (stats['latencies'] + [round(latency, 3)])[-MAX_SAMPLES:]
+    stats['total_seconds'] = round(stats['total_seconds'] + latency, 3)
+
+def record_success(health, feed_url, latency, bozo=False):
+    with _lock:
+        stats = _stats(health, feed_url)
+        stats['runs'] += 1
+        stats['successes'] += 1
+        stats['consecutive_failures'] = 0
+        stats['open_until'] = 0
+        stats['last_success'] = time.time()
+        if bozo:
+            stats['bozo'] += 1
+        _add_latency(stats, latency)
+
+def record_failure(health, feed_url, latency, error):
+    """
+    Counts a failure and opens the circuit once the threshold is reached.
+    Each failed probe after that doubles the cooldown (up to the max).
+    """
+    with _lock:
+        stats = _stats(health, feed_url)
+        stats['runs'] += 1
+        stats['failures'] += 1
+        stats['consecutive_failures'] += 1
+        stats['last_error'] = str(error)[:200]
+        _add_latency(stats, latency)
+
+        over = stats['consecutive_failures'] - CIRCUIT_FAILURE_THRESHOLD
+        if over >= 0:
+            cooldown = min(CIRCUIT_COOLDOWN_HOURS * 2 ** over, CIRCUIT_MAX_COOLDOWN_HOURS)
+            stats['open_until'] = time.time() + cooldown * 3600
+
+def claim(recorded, feed_url):
+    """
+    Marks feed_url's outcome for this run as recorded. A feed dropped at
+    the fetch deadline must not be counted again when it finishes late.
+    recorded: set shared by everything recording this run's fetches
+    Returns: True for the first claim only
+    """
+    with _lock:
+        if feed_url in recorded:
+            return False
+        recorded.add(feed_url)
+        return True
+
+def record_useful(health, feed_url, count):
+    """
+    Credits a feed with the articles that survived dedup and selection.
+    """
+    with _lock:
+        _stats(health, feed_url)['useful_articles'] += count
+
+def is_open(health, feed_url, now=None):
+    """
+    True while a failing feed is cooling down. Once the cooldown expires
+    the feed gets a single probe; record_success closes the circuit.
+    """
+    stats = health.get(feed_url)
+    if not stats:
+        return False
+    return (now or time.time()) < stats.get('open_until', 0)
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def error_rate(stats):
+    return stats['failures'] / stats['runs'] if stats.get('runs') else 0.0
+
+def fetch_order(health, feed_urls):
+    """
+    Orders feeds for submission: reliable feeds first, slowest of those
+    first (so they don't finish last), chronically failing feeds at the back.
+    """
+    def priority(url):
+        stats = health.get(url)
+        if not stats:
+            return (False, 0.0)
+        return (error_rate(stats) > 0.5, -percentile(stats['latencies'], 50))
+
+    return sorted(feed_urls, key=priority)
+
+def print_report(health=None):
+    """
+    Prints which sources cost the most time for the fewest useful articles.
+    """
+    health = load_health() if health is None else health
+    if not health:
+        print("No feed health data recorded yet.")
+        return
+
+    rows = []
+    for url, stats in health.items():
+        useful = stats.get('useful_articles', 0)
+        cost = stats.get('total_seconds', 0.0) / max(useful, 1)
+        rows.append((cost, url, stats, useful))
+    rows.sort(key=lambda row: row[0], reverse=True)
+
+    print(f"{'sec/article':>11} {'p50':>6} {'p95':>6} {'err%':>5} {'bozo':>4} {'useful':>6}  {'last success':<16} feed")
+    for cost, url, stats, useful in rows:
+        last_success = stats.get('last_success')
+        last_str = datetime.fromtimestamp(last_success).strftime('%Y-%m-%d %H:%M') if last_success else 'never'
+        state = "  [circuit open]" if is_open(health, url) else ""
+        print(
+            f"{cost:>11.2f} {percentile(stats['latencies'], 50):>6.2f} {percentile(stats['latencies'], 95):>6.2f} "
+            f"{error_rate(stats) * 100:>5.0f} {stats.get('bozo', 0):>4} {useful:>6}  {last_str:<16} {url}{state}"
+        )
+
+if __name__ == "__main__":
+    print_report()
@@ -0,0 +1,152 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from config import (
+    HTTP_POOL_HOSTS, HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    HTTP2_ENABLED, HTTP_POOL_TIMEOUT
+)
+from modules import metrics
+
+# -------------------------------------------------------------------------
+# Connection accounting: every new TCP(+TLS) connection is timed, so the
+# stage report can show how many handshakes keep-alive saved.
+# -------------------------------------------------------------------------
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        metrics.incr("http.connections_opened")
+        metrics.incr("http.connect_seconds", time.perf_counter() - start)
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        metrics.incr("http.connections_opened")
+        metrics.incr("http.connect_seconds", time.perf_counter() - start)
+
+class _PoolTimeoutMixin:
+    # requests never passes pool_timeout, and a blocking pool would then
+    # wait forever for a connection that a leaked response still holds
+    def urlopen(self, method, url, *args, pool_timeout=None, **kwargs):
+        if pool_timeout is None:
+            pool_timeout = HTTP_POOL_TIMEOUT
+        return super().urlopen(method, url, *args, pool_timeout=pool_timeout, **kwargs)
+
+class _TimedHTTPConnectionPool(_PoolTimeoutMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(_PoolTimeoutMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class PooledAdapter(HTTPAdapter):
+    """
+    Keep-alive adapter: one pool per host, at most
+    HTTP_MAX_CONNECTIONS_PER_HOST connections each (callers wait up to
+    HTTP_POOL_TIMEOUT for a free one). With block=False a full pool opens
+    an extra connection instead of waiting, and keeps up to the limit.
+    """
+
+    def __init__(self, block=True):
+        super().__init__(
+            pool_connections=HTTP_POOL_HOSTS,
+            pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST,
+            pool_block=block
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+def _count_request(response, *args, **kwargs):
+    metrics.incr("http.requests")
+
+def _build_session(block=True):
+    session = requests.Session()
+    adapter = PooledAdapter(block)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(_count_request)
+    return session
+
+# Shared by the feed fetcher and the Bytez client (requests.Session is safe
+# to share for plain request calls across threads)
+SESSION = _build_session()
+# Hedged (backup) Bytez requests: a hedge that queued behind the primaries
+# it races, all holding SESSION's per-host connections, could never win
+HEDGE_SESSION = _build_session(block=False)
+
+_http2_client = None
+_http2_lock = threading.Lock()
+
+def _get_http2_client():
+    """
+    Lazily builds an httpx HTTP/2 client; returns None when httpx/h2
+    are not installed so callers fall back to the pooled session.
+    """
+    global _http2_client
+    with _http2_lock:
+        if _http2_client is None:
+            try:
+                import httpx
+                _http2_client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=HTTP_POOL_HOSTS * HTTP_MAX_CONNECTIONS_PER_HOST)
+                )
+            except ImportError:
+                print("  > HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1 keep-alive.")
+                _http2_client = False
+    return _http2_client or None
+
+def _timeout(kwargs):
+    return kwargs.pop("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+
+def get(url, **kwargs):
+    """
+    GET through the shared keep-alive pool. timeout is (connect, read).
+    """
+    return SESSION.get(url, timeout=_timeout(kwargs), **kwargs)
+
+def post(url, hedge=False, **kwargs):
+    """
+    POST through the shared pool, or over HTTP/2 when HTTP2_ENABLED (not
+    for streamed responses, which always use the requests session).
+    hedge: send on HEDGE_SESSION, which never waits for a free connection
+    """
+    timeout = _timeout(kwargs)
+    if hedge:
+        return HEDGE_SESSION.post(url, timeout=timeout, **kwargs)
+    if HTTP2_ENABLED and not kwargs.get("stream"):
+        client = _get_http2_client()
+        if client is not None:
+            import httpx
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            # Streams multiplexed on httpx's own connections: not urllib3
+            # pool reuse, so kept out of http.requests
+            metrics.incr("http2.requests")
+            return client.post(url, timeout=httpx.Timeout(read, connect=connect), **kwargs)
+    return SESSION.post(url, timeout=timeout, **kwargs)
+
+def report_connection_reuse():
+    """
+    Adds connection-reuse figures to the stage metrics: requests served on
+    an already-open pooled (urllib3) connection, and the handshake time
+    that saved (estimated from the measured mean connect time). HTTP/2
+    requests are counted separately, as http2.requests.
+    """
+    counters = metrics.snapshot()["counters"]
+    requests_made = counters.get("http.requests", 0)
+    opened = counters.get("http.connections_opened", 0)
+    if not requests_made:
+        return
+    reused = max(0, requests_made - opened)
+    mean_connect = counters.get("http.connect_seconds", 0.0) / opened if opened else 0.0
+    metrics.incr("http.reused_connections", reused)
+    metrics.incr("http.handshake_seconds_saved", reused * mean_connect)
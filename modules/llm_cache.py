@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from config import (
+    LLM_CACHE_ENABLED, LLM_CACHE_DIR, LLM_CACHE_MAX_AGE_HOURS, LLM_CACHE_MAX_MB,
+    LLM_CACHE_EVICT_INTERVAL_HOURS
+)
+from modules import metrics
+
+_lock = threading.Lock()
+_last_evicted = None
+
+def cache_key(model, system_prompt, user_prompt, params):
+    """
+    Content address of one LLM call: identical inputs -> identical key.
+    """
+    blob = json.dumps(
+        {"model": model, "system": system_prompt, "user": user_prompt, "params": params},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+def _path(key):
+    return os.path.join(LLM_CACHE_DIR, key + ".json")
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def evict():
+    """
+    Drops entries older than LLM_CACHE_MAX_AGE_HOURS, then the least
+    recently used ones until the cache fits in LLM_CACHE_MAX_MB.
+    """
+    if not os.path.isdir(LLM_CACHE_DIR):
+        return
+    cutoff = time.time() - LLM_CACHE_MAX_AGE_HOURS * 3600
+    entries = []
+    for name in os.listdir(LLM_CACHE_DIR):
+        path = os.path.join(LLM_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                created = json.load(f).get("created", 0)
+        except (OSError, ValueError, AttributeError):
+            _remove(path)
+            continue
+        if created < cutoff:
+            _remove(path)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    # mtime is the last-access time (hits touch the file)
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    budget = LLM_CACHE_MAX_MB * 1024 * 1024
+    while entries and total > budget:
+        _, size, path = entries.pop(0)
+        _remove(path)
+        total -= size
+
+def _evict_if_due():
+    # On first use, then every LLM_CACHE_EVICT_INTERVAL_HOURS, so a
+    # scheduler that never exits (main.py) still keeps the cache bounded
+    global _last_evicted
+    with _lock:
+        now = time.monotonic()
+        if _last_evicted is None or now - _last_evicted >= LLM_CACHE_EVICT_INTERVAL_HOURS * 3600:
+            _last_evicted = now
+            try:
+                evict()
+            except OSError as e:
+                print(f"Error evicting LLM cache: {e}")
+
+def get(key):
+    """
+    Returns the cached raw model output for key, or None.
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    _evict_if_due()
+
+    path = _path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry["created"] < time.time() - LLM_CACHE_MAX_AGE_HOURS * 3600:
+            return None
+        output = entry["output"]
+        os.utime(path)  # Mark as recently used
+        metrics.incr("llm_cache.hits")
+        return output
+    except (OSError, ValueError, KeyError):
+        return None
+
+def put(key, model, output):
+    if not LLM_CACHE_ENABLED or not output:
+        return
+    _evict_if_due()
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        tmp_path = _path(key) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"model": model, "created": time.time(), "output": output}, f, ensure_ascii=False)
+        os.replace(tmp_path, _path(key))
+    except OSError as e:
+        print(f"Error writing LLM cache: {e}")
+
+def record_miss():
+    if LLM_CACHE_ENABLED:
+        metrics.incr("llm_cache.misses")
@@ -0,0 +1,61 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages run on several threads in the streaming pipeline
+_lock = threading.Lock()
+_timings = {}   # stage -> [seconds, ...]
+_counters = {}  # name -> number
+
+@contextmanager
+def stage(name):
+    """
+    Times a block of work under a stage name:
+        with metrics.stage("fetch"): ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - start)
+
+def add_timing(name, seconds):
+    with _lock:
+        _timings.setdefault(name, []).append(seconds)
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def snapshot():
+    """
+    Returns: dict { "timings": {stage: [seconds]}, "counters": {name: value} }
+    """
+    with _lock:
+        return {
+            "timings": {k: list(v) for k, v in _timings.items()},
+            "counters": dict(_counters)
+        }
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+def print_report():
+    data = snapshot()
+    if not data["timings"] and not data["counters"]:
+        return
+
+    print("--- Stage Timings ---")
+    for name, samples in data["timings"].items():
+        total = sum(samples)
+        if len(samples) == 1:
+            print(f"  {name:<32} {total:>8.2f}s")
+        else:
+            print(f"  {name:<32} {total:>8.2f}s  ({len(samples)} calls, max {max(samples):.2f}s)")
+    for name, value in sorted(data["counters"].items()):
+        if isinstance(value, float):
+            print(f"  {name:<32} {value:>9.2f}")
+        else:
+            print(f"  {name:<32} {value:>9}")
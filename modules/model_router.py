@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from config import (
+    MODEL_SCOREBOARD_PATH, MODEL_EJECT_AFTER, MODEL_EJECT_HOURS, MODEL_MAX_EJECT_HOURS,
+    MODEL_MIN_SUCCESS_RATE, MODEL_MIN_SAMPLES
+)
+from modules.feed_health import percentile
+
+# Latency samples kept per model for percentile estimates
+MAX_SAMPLES = 50
+
+# Outcomes passed to record_result()
+SUCCESS = "success"
+EMPTY = "empty"
+ERROR = "error"
+RATE_LIMITED = "rate_limited"
+
+# Every summarization worker reads and updates the same scoreboard
+_lock = threading.RLock()
+_board = None
+
+def load_scoreboard():
+    """
+    Loads per-model routing stats.
+    Returns: dict { model: {...stats...} }
+    """
+    try:
+        if os.path.exists(MODEL_SCOREBOARD_PATH):
+            with open(MODEL_SCOREBOARD_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"Error loading model scoreboard: {e}")
+    return {}
+
+def _get_board():
+    global _board
+    with _lock:
+        if _board is None:
+            _board = load_scoreboard()
+        return _board
+
+def _save(board):
+    try:
+        os.makedirs(os.path.dirname(MODEL_SCOREBOARD_PATH), exist_ok=True)
+        tmp_path = MODEL_SCOREBOARD_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(board, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, MODEL_SCOREBOARD_PATH)
+    except Exception as e:
+        print(f"Error saving model scoreboard: {e}")
+
+def _stats(board, model):
+    return board.setdefault(model, {
+        'calls': 0,
+        'successes': 0,
+        'empty': 0,
+        'errors': 0,
+        'rate_limited': 0,
+        'consecutive_failures': 0,
+        'latencies': [],
+        'last_success': None,
+        'ejected_until': 0
+    })
+
+def record_result(model, outcome, latency):
+    """
+    Records one Bytez call. 429s are a quota signal, not a model fault, so
+    they are counted but don't affect the success rate or ejection.
+    Errors and empty outputs in a row eject the model; each failed probe
+    after that doubles the ejection (up to MODEL_MAX_EJECT_HOURS).
+    """
+    with _lock:
+        board = _get_board()
+        stats = _stats(board, model)
+        if outcome == RATE_LIMITED:
+            stats['rate_limited'] += 1
+        else:
+            stats['calls'] += 1
+            if outcome == SUCCESS:
+                stats['successes'] += 1
+                stats['consecutive_failures'] = 0
+                stats['ejected_until'] = 0
+                stats['last_success'] = time.time()
+                stats['latencies'] = (stats['latencies'] + [round(latency, 3)])[-MAX_SAMPLES:]
+            else:
+                stats['empty' if outcome == EMPTY else 'errors'] += 1
+                stats['consecutive_failures'] += 1
+                over = stats['consecutive_failures'] - MODEL_EJECT_AFTER
+                if over >= 0:
+                    hours = min(MODEL_EJECT_HOURS * 2 ** over, MODEL_MAX_EJECT_HOURS)
+                    stats['ejected_until'] = time.time() + hours * 3600
+                    print(f"  > Ejecting {model} from routing for {hours:g}h "
+                          f"({stats['consecutive_failures']} failures in a row).")
+        _save(board)
+
+def success_rate(stats):
+    return stats['successes'] / stats['calls'] if stats.get('calls') else 1.0
+
+def empty_rate(stats):
+    return stats['empty'] / stats['calls'] if stats.get('calls') else 0.0
+
+def is_ejected(stats, now=None):
+    return (now or time.time()) < stats.get('ejected_until', 0)
+
+def latency_percentile(model, pct):
+    """
+    Observed successful-call latency of a model, or None until it has
+    MODEL_MIN_SAMPLES samples.
+    """
+    with _lock:
+        stats = _get_board().get(model)
+        if not stats or len(stats['latencies']) < MODEL_MIN_SAMPLES:
+            return None
+        return percentile(stats['latencies'], pct)
+
+def order_models(models):
+    """
+    Orders the fallback chain for one request.
+
+    Healthy models (too few calls to judge, or success rate at least
+    MODEL_MIN_SUCCESS_RATE) keep their configured preference order.
+    Degraded ones follow, fastest expected time-to-success first
+    (p50 latency / success rate). Ejected models are skipped; if every
+    model is ejected, the one whose ejection ends first is probed.
+    """
+    with _lock:
+        board = _get_board()
+        now = time.time()
+        healthy, degraded, ejected = [], [], []
+        for model in models:
+            stats = board.get(model)
+            if not stats:
+                healthy.append(model)
+            elif is_ejected(stats, now):
+                ejected.append((stats['ejected_until'], model))
+            elif stats['calls'] < MODEL_MIN_SAMPLES or success_rate(stats) >= MODEL_MIN_SUCCESS_RATE:
+                healthy.append(model)
+            else:
+                # No successful call yet means no expected time-to-success
+                if not stats['latencies']:
+                    degraded.append((float('inf'), model))
+                    continue
+                rate = max(success_rate(stats), 0.01)
+                degraded.append((percentile(stats['latencies'], 50) / rate, model))
+
+    ordered = healthy + [model for _, model in sorted(degraded)]
+    if not ordered and ejected:
+        ordered = [min(ejected)[1]]
+    return ordered
+
+def print_report(board=None):
+    board = load_scoreboard() if board is None else board
+    if not board:
+        print("No model routing data recorded yet.")
+        return
+
+    print(f"{'calls':>5} {'ok%':>5} {'empty%':>6} {'p50':>6} {'p95':>6} {'429s':>5}  model")
+    for model, stats in sorted(board.items(), key=lambda item: -success_rate(item[1])):
+        state = "  [ejected]" if is_ejected(stats) else ""
+        print(
+            f"{stats['calls']:>5} {success_rate(stats) * 100:>5.0f} {empty_rate(stats) * 100:>6.0f} "
+            f"{percentile(stats['latencies'], 50):>6.1f} {percentile(stats['latencies'], 95):>6.1f} "
+            f"{stats['rate_limited']:>5}  {model}{state}"
+        )
+
+if __name__ == "__main__":
+    print_report()
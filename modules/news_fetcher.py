@@ -1,47 +1,428 @@
-import feedparser
-from config import RSS_FEEDS
+import calendar
+import heapq
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import (
+    RSS_FEEDS, FETCH_MAX_WORKERS, FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT, FETCH_DEADLINE,
+    FEED_CACHE_ENABLED, DEDUP_ENABLED, ARTICLES_PER_FEED, ARTICLES_PER_CATEGORY,
+    MAX_ARTICLES_PER_SOURCE, CATEGORY_SELECTION, FEED_PARSER, FEED_STREAM_MAX_ENTRIES, FEED_MAX_BYTES
+)
+from modules import feed_cache, feed_health, http_client, replay
+from modules.dedup import canonicalize_url, load_index
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import time
 
-def fetch_rss_news():
+# Some publishers reject the default python-requests agent. This is the
+# identity feedparser sends, spelled out so it needn't be imported for it.
+FEED_USER_AGENT = "feedparser/6.0.14 +https://github.com/kurtmckee/feedparser/"
+FEED_HEADERS = {"User-Agent": FEED_USER_AGENT}
+FEED_CHUNK_SIZE = 16 * 1024
+
+def entry_timestamp(entry):
     """
-    Fetches news from RSS feeds and organizes them by Category.
-    Returns: dict { "Category": [ {title, link, summary, published}, ... ] }
+    Publish (or last update) time of a feed entry as a UTC epoch, 0 if unknown.
+    """
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if not parsed:
+        return 0
+    try:
+        return calendar.timegm(parsed)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+def article_source(article):
+    host = (urlsplit(article.get('link', '')).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def select_top_articles(articles, top_k, max_per_source=None):
+    """
+    Picks the top_k most recent articles, at most max_per_source per
+    publisher. Uses bounded heaps: O(n log k).
+    Ties (and undated items) keep their original order.
+    Returns: list, newest first
+    """
+    def rank(indexed):
+        position, article = indexed
+        return (article.get('published_ts', 0), -position)
+
+    candidates = list(enumerate(articles))
+    if max_per_source:
+        # Top-m per source, then top-k of the survivors, equals the greedy
+        # "newest first, skip sources that are full" selection.
+        by_source = {}
+        for item in candidates:
+            by_source.setdefault(article_source(item[1]), []).append(item)
+        candidates = [
+            item for group in by_source.values()
+            for item in heapq.nlargest(max_per_source, group, key=rank)
+        ]
+
+    return [article for _, article in heapq.nlargest(top_k, candidates, key=rank)]
+
+def category_selection(category):
+    """
+    Returns (top_k, max_per_source) for a category, honoring CATEGORY_SELECTION.
+    """
+    overrides = CATEGORY_SELECTION.get(category, {})
+    return (
+        overrides.get('top_k', ARTICLES_PER_CATEGORY),
+        overrides.get('max_per_source', MAX_ARTICLES_PER_SOURCE)
+    )
+
+def fetch_feed(feed_url, cache=None, health=None, recorded=None):
+    """
+    Downloads and parses a single RSS/Atom feed.
+    With a validator cache, sends a conditional GET and reuses the
+    previously parsed entries on 304 Not Modified.
+    With a health table, records latency, errors and malformed (bozo) feeds,
+    unless the feed's outcome is already in the recorded set (see
+    feed_health.claim).
+    Returns: list [ {title, link, summary, published, published_ts}, ... ]
+    """
+    start = time.time()
+    record = health is not None
+    try:
+        articles, bozo = _download_feed(feed_url, cache)
+    except Exception as e:
+        if record and (recorded is None or feed_health.claim(recorded, feed_url)):
+            feed_health.record_failure(health, feed_url, time.time() - start, e)
+        raise
+
+    if record and (recorded is None or feed_health.claim(recorded, feed_url)):
+        feed_health.record_success(health, feed_url, time.time() - start, bozo)
+    return articles
+
+def _download_feed(feed_url, cache):
+    """
+    Returns: (articles, bozo) where bozo flags a feed that failed strict parsing.
+    """
+    headers = dict(FEED_HEADERS)
+    if cache is not None:
+        headers.update(feed_cache.conditional_headers(cache, feed_url))
+
+    response = http_client.get(
+        replay.route(feed_url),
+        headers=headers,
+        timeout=(FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT),
+        stream=True
+    )
+
+    if response.status_code == 304 and cache is not None:
+        articles = feed_cache.cached_articles(cache, feed_url)
+        response.close()
+        if articles is not None:
+            return articles, False
+        # Validators without a body to reuse: ask again unconditionally
+        response = http_client.get(
+            replay.route(feed_url),
+            headers=FEED_HEADERS,
+            timeout=(FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT),
+            stream=True
+        )
+
+    try:
+        response.raise_for_status()
+        if replay.is_recording():
+            replay.record_feed(feed_url, response)
+        if FEED_PARSER == "stream":
+            articles, bozo = _parse_streamed(response)
+        else:
+            articles, bozo = parse_feed_document(response.content)
+    finally:
+        # Hands the connection back (or drops it if we stopped reading early)
+        response.close()
+
+    # Keep the freshest entries, whatever order the publisher uses
+    articles = select_top_articles(articles, ARTICLES_PER_FEED)
+
+    if cache is not None:
+        feed_cache.store_response(cache, feed_url, response, articles)
+    return articles, bozo
+
+def parse_feed_document(body):
+    """
+    Full-document parse with feedparser (tolerant of malformed feeds).
+    Returns: (articles, bozo)
+    """
+    # Imported here: most feeds go through the streaming parser, so
+    # feedparser only loads when one of them turns out to be malformed
+    import feedparser
+
+    feed = feedparser.parse(body)
+    articles = []
+    if isinstance(feed.entries, list):
+        for entry in feed.entries:
+            link = entry.get('link')
+            if not link:
+                continue
+            articles.append({
+                'title': entry.get('title', ''),
+                'link': link,
+                'summary': entry.get('summary', ''),
+                'published': entry.get('published', 'N/A'),
+                'published_ts': entry_timestamp(entry)
+            })
+    return articles, bool(feed.get('bozo'))
+
+def _parse_streamed(response):
+    """
+    Streams the response body through parse_feed_stream, keeping the bytes
+    read so far so a malformed feed can be handed to feedparser instead.
+    Returns: (articles, bozo)
+    """
+    received = []
+    # One iterator for both passes: requests refuses a second iter_content()
+    # once the body has been read to the end
+    body = response.iter_content(FEED_CHUNK_SIZE)
+
+    def chunks():
+        for chunk in body:
+            received.append(chunk)
+            yield chunk
+
+    try:
+        articles = parse_feed_stream(chunks())
+        if articles:
+            return articles, False
+        parse_error = False
+    except ET.ParseError:
+        parse_error = True
+
+    # Malformed, empty, or not RSS/Atom at all: read the rest, within the
+    # cap. A well-formed feed with no items is not bozo; feedparser decides.
+    size = sum(len(chunk) for chunk in received)
+    for chunk in body:
+        if size >= FEED_MAX_BYTES:
+            break
+        received.append(chunk)
+        size += len(chunk)
+
+    articles, bozo = parse_feed_document(b"".join(received))
+    return articles, parse_error or bozo
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+def _parse_date(text):
+    """
+    RFC 822 (RSS) or ISO 8601 (Atom) date string -> UTC epoch, 0 if unknown.
     """
-    categorized_news = {}
+    if not text:
+        return 0
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return calendar.timegm(parsed.utctimetuple())
 
+def _entry_from_element(elem):
+    fields = {}
+    link = None
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == 'link':
+            # RSS: <link>url</link>; Atom: <link rel="alternate" href="url"/>
+            if child.get('href'):
+                if child.get('rel', 'alternate') == 'alternate' and link is None:
+                    link = child.get('href')
+            elif child.text and link is None:
+                link = child.text.strip()
+        elif name not in fields:
+            fields[name] = child.text or ''
+
+    if not link:
+        link = fields.get('guid', '').strip() if fields.get('guid', '').startswith('http') else None
+    if not link:
+        return None
+
+    published = fields.get('pubDate') or fields.get('published') or fields.get('updated') or fields.get('date')
+    return {
+        'title': (fields.get('title') or '').strip(),
+        'link': link,
+        'summary': fields.get('description') or fields.get('summary') or fields.get('encoded') or fields.get('content') or '',
+        'published': published.strip() if published else 'N/A',
+        'published_ts': _parse_date(published)
+    }
+
+def parse_feed_stream(chunks, max_entries=FEED_STREAM_MAX_ENTRIES, max_bytes=FEED_MAX_BYTES):
+    """
+    Incrementally parses RSS 2.0, RSS 1.0 (RDF) or Atom from an iterable of
+    byte chunks. Stops reading as soon as max_entries items are complete or
+    max_bytes have been consumed, so large feeds are never fully downloaded
+    or built in memory. Publishers list newest items first, so the first
+    max_entries are the candidates for recency selection.
+    Returns: list of article dicts
+    Raises: xml.etree.ElementTree.ParseError on malformed XML
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    articles = []
+    consumed = 0
+
+    for chunk in chunks:
+        if consumed + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - consumed]
+        consumed += len(chunk)
+        parser.feed(chunk)
+
+        for _, elem in parser.read_events():
+            if _local_name(elem.tag) not in ('item', 'entry'):
+                continue
+            article = _entry_from_element(elem)
+            if article:
+                articles.append(article)
+            # Drop the item's subtree; only the parsed dict is kept
+            elem.clear()
+            if len(articles) >= max_entries:
+                return articles
+
+        if consumed >= max_bytes:
+            break
+
+    return articles
+
+def iter_feeds(feed_urls, deadline=FETCH_DEADLINE, cache=None, health=None):
+    """
+    Fetches many feeds concurrently on a bounded thread pool.
+    Yields (feed_url, articles) as each feed finishes. Failed feeds, feeds
+    skipped by an open circuit breaker, and feeds still running when the
+    deadline expires are logged and yielded with articles=None so callers
+    always hear back about every URL.
+    """
+    skipped = []
+    if health is not None:
+        skipped = [url for url in feed_urls if feed_health.is_open(health, url)]
+        feed_urls = feed_health.fetch_order(health, [url for url in feed_urls if url not in skipped])
+
+    # Each feed's outcome is recorded once, by its worker or by the deadline
+    recorded = set()
+    executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS)
+    futures = {executor.submit(fetch_feed, url, cache, health, recorded): url for url in feed_urls}
+    pending = set(futures)
+    end_time = time.time() + deadline
+
+    try:
+        for url in skipped:
+            print(f"Skipping {url}: circuit open after repeated failures.")
+            yield url, None
+
+        while pending:
+            done, pending = wait(pending, timeout=max(0, end_time - time.time()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+
+            for future in done:
+                url = futures[future]
+                try:
+                    yield url, future.result()
+                except Exception as e:
+                    print(f"Error fetching {url}: {e}")
+                    yield url, None
+
+        for future in pending:
+            # A feed that never got a worker isn't at fault for the deadline
+            if not future.cancel() and health is not None and feed_health.claim(recorded, futures[future]):
+                feed_health.record_failure(health, futures[future], deadline, "missed fetch deadline")
+            print(f"Dropped {futures[future]}: missed the {deadline}s fetch deadline.")
+            yield futures[future], None
+    finally:
+        # Don't block on stragglers; their socket timeouts will reap them.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_rss_news(in_order=True):
+    """
+    Streams news by Category: yields (category, articles) as soon as every
+    feed of that category has finished, so downstream stages can start
+    while other categories are still downloading.
+
+    Stories are deduplicated by canonical URL across all categories and
+    against the persisted index of stories already sent in earlier digests.
+    With in_order=True categories are released in config order (the first
+    category in config wins a shared story); otherwise in completion order
+    (the first category to finish wins).
+    """
     print("--- Fetching Raw Feed Data ---")
-    
-    for category, feeds in RSS_FEEDS.items():
-        print(f"Processing Category: {category}...")
-        categorized_news[category] = []
-        
-        seen_links = set() # Per category deduplication
-
-        for feed_url in feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                # Sort by published date if available, new first
-                if isinstance(feed.entries, list):
-                    # Simple cap of 15 articles per feed to keep it fresh
-                    entries = feed.entries[:15]
-                    
-                    for entry in entries:
-                        if entry.link in seen_links:
+    start = time.time()
+
+    # Each URL is downloaded once, even if it is listed more than once
+    unique_urls = list(dict.fromkeys(url for feeds in RSS_FEEDS.values() for url in feeds))
+    cache = feed_cache.load_feed_cache() if FEED_CACHE_ENABLED else None
+    health = feed_health.load_health()
+
+    covered = load_index() if DEDUP_ENABLED else {}
+    seen_ids = set() # Shared by all categories
+    skipped = 0
+
+    feed_results = {}
+    outstanding = list(RSS_FEEDS)
+
+    try:
+        for feed_url, articles in iter_feeds(unique_urls, cache=cache, health=health):
+            feed_results[feed_url] = articles
+
+            while outstanding:
+                ready = [c for c in outstanding if all(url in feed_results for url in RSS_FEEDS[c])]
+                if not ready:
+                    break
+                category = outstanding[0] if in_order else ready[0]
+                if category not in ready:
+                    break
+                outstanding.remove(category)
+
+                items = []
+                origin = {} # article id -> feed it came from
+                # Merge in config order so the earliest feed keeps a duplicate
+                for url in RSS_FEEDS[category]:
+                    for article in feed_results.get(url) or []:
+                        article_id = canonicalize_url(article['link'])
+                        if article_id in seen_ids or article_id in origin:
                             continue
-                        seen_links.add(entry.link)
-                        
-                        categorized_news[category].append({
-                            'title': entry.title,
-                            'link': entry.link,
-                            'summary': getattr(entry, 'summary', ''),
-                            'published': getattr(entry, 'published', 'N/A')
-                        })
-            except Exception as e:
-                print(f"Error fetching {feed_url}: {e}")
-
-        print(f"  > Collected {len(categorized_news[category])} items for {category}.")
-
-    return categorized_news
+                        origin[article_id] = url
+                        if article_id in covered:
+                            skipped += 1
+                            continue
+                        items.append(dict(article, id=article_id))
+
+                top_k, max_per_source = category_selection(category)
+                items = select_top_articles(items, top_k, max_per_source)
+                # Only stories that made the cut are claimed from other categories
+                seen_ids.update(article['id'] for article in items)
+
+                useful = {}
+                for article in items:
+                    useful[origin[article['id']]] = useful.get(origin[article['id']], 0) + 1
+                for url, count in useful.items():
+                    feed_health.record_useful(health, url, count)
+
+                print(f"  > Collected {len(items)} items for {category} ({time.time() - start:.1f}s).")
+                yield category, items
+
+        # Only reached with categories that list no feeds at all
+        for category in outstanding:
+            yield category, []
+    finally:
+        if cache is not None:
+            feed_cache.save_feed_cache(cache, keep_urls=unique_urls)
+        feed_health.save_health(health)
+
+    fetched = sum(1 for articles in feed_results.values() if articles is not None)
+    print(f"  > Fetched {fetched}/{len(unique_urls)} feeds in {time.time() - start:.1f}s.")
+    if skipped:
+        print(f"  > Skipped {skipped} stories already covered in earlier digests.")
+
+def fetch_rss_news():
+    """
+    Fetches news from RSS feeds and organizes them by Category.
+    Returns: dict { "Category": [ {id, title, link, summary, published}, ... ] }
+    """
+    return dict(iter_rss_news(in_order=True))
 
 def filter_by_interests(news_data):
     """
@@ -1,13 +1,15 @@
 from fpdf import FPDF
+from fpdf.enums import XPos
 from datetime import datetime
 import os
-import re
+from modules import document
 
 # --- COLORS (From Stitch Design) ---
 COLOR_PRIMARY = (26, 54, 93)      # Deep Navy Blue
 COLOR_ACCENT = (185, 28, 28)      # Deep Crimson
 COLOR_TEXT_DARK = (15, 23, 42)    # Slate 900
 COLOR_TEXT_GRAY = (100, 116, 139) # Slate 500
+COLOR_BODY = (30, 30, 30)
 COLOR_BG_LIGHT = (255, 255, 255)
 
 class NewspaperPDF(FPDF):
@@ -60,42 +62,78 @@ class NewspaperPDF(FPDF):
         self.line(10, self.get_y(), 60, self.get_y()) # Short line
         self.ln(5)
 
-    def write_styled_text(self, text):
+    # Body styles: (family, style, size, color)
+    BODY_STYLE = ('Times', '', 11, COLOR_BODY)
+    HEADLINE_STYLE = ('Times', 'B', 12, COLOR_PRIMARY)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Word widths per font, for the line breaking in write_run()
+        self._widths = {}
+        self._applied_style = None
+
+    def apply_style(self, style):
         """
-        Parses text for *bold* markers and writes it accordingly.
-        Respects the CURRENT font family/size/style but toggles Bold.
+        Sets font and text color, skipping both calls when that style is
+        already in effect (add_page restores it after the header).
         """
-        # Save current font state
-        current_font = self.font_family
-        current_style = self.font_style
-        current_size = self.font_size_pt
-        
-        # Split by *bold* markers: "Normal *Bold* Normal" -> ['Normal ', 'Bold', ' Normal']
-        parts = re.split(r'\*([^*]+)\*', text)
-        
-        for i, part in enumerate(parts):
-            if not part: continue
-            
-            if i % 2 == 1:
-                # Odd indices are the captured bold text.
-                # Logic: Toggle BOLD. 
-                # If current style has 'B', remove it (Regular).
-                # If current style lacks 'B', add it (Bold).
-                
-                new_style = current_style
-                if 'B' in current_style:
-                    new_style = new_style.replace('B', '')
-                else:
-                    new_style += 'B'
-                
-                self.set_font(current_font, new_style, current_size)
-                self.write(5, part)
-                # Revert
-                self.set_font(current_font, current_style, current_size)
-            else:
-                # Even indices are normal text (keep current style)
-                self.set_font(current_font, current_style, current_size)
-                self.write(5, part)
+        if style != self._applied_style:
+            family, font_style, size, color = style
+            self.set_font(family, font_style, size)
+            self.set_text_color(*color)
+            self._applied_style = style
+
+    def word_width(self, word):
+        key = (self.font_family, self.font_style, self.font_size_pt, word)
+        width = self._widths.get(key)
+        if width is None:
+            width = self._widths[key] = self.get_string_width(word)
+        return width
+
+    def write_run(self, h, text, link=""):
+        """
+        Same output as write(h, text, link) for text without newlines, but
+        wrapped here on whole words (widths cached per font) with one cell
+        per line piece, instead of fpdf's per-character line breaker.
+        """
+        padding = 2 * self.c_margin
+        room = self.w - self.r_margin - self.x - padding
+        if self.word_width(text) <= room:
+            self.write_piece(h, text, link)
+            return
+
+        full = self.w - self.l_margin - self.r_margin - padding
+        space = self.word_width(' ')
+        line, width = [], 0.0
+        for word in text.split(' '):
+            if not line and not word and room == full:
+                continue # no leading spaces on wrapped lines
+            word_width = self.word_width(word)
+            needed = width + (space if line else 0) + word_width
+            if needed <= room:
+                line.append(word)
+                width = needed
+                continue
+
+            self.write_piece(h, ' '.join(line), link)
+            # Only break after something already on this line
+            if self.x > self.l_margin:
+                self.ln(h)
+            if word_width > full:
+                # Longer than a line: let fpdf break it mid-word
+                self.write(h, word, link=link)
+                room = self.w - self.r_margin - self.x - padding
+                # The next word still needs its separating space
+                line, width = [''], 0.0
+                continue
+            room = full
+            line, width = [word], word_width
+        self.write_piece(h, ' '.join(line), link)
+
+    def write_piece(self, h, text, link):
+        # A piece known to fit on the current line
+        if text:
+            self.cell(h=h, text=text, link=link, new_x=XPos.WCONT)
 
     def article_content(self, title, body):
         # Headline
@@ -103,121 +141,103 @@ class NewspaperPDF(FPDF):
         self.set_text_color(*COLOR_TEXT_DARK)
         self.multi_cell(0, 6, clean_text_for_pdf(title))
         self.ln(2)
+        self._applied_style = None
 
-        # Body Text
-        self.set_font('Times', '', 11)
-        self.set_text_color(30, 30, 30)
-        
-        # 1. Parse content into lines first
-        lines = body.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line behaves like a title
-            is_headline = False
-            if re.match(r'^\d+\.', line) or line.startswith('*') or line.startswith('#'):
-                is_headline = True
-                
+        # Body Text, from the parse shared with the Slack renderer
+        for paragraph in document.parse(body):
+            is_headline = paragraph.kind != document.TEXT
+            base = self.HEADLINE_STYLE if is_headline else self.BODY_STYLE
             if is_headline:
                 self.ln(4) # Extra space before new item
-                self.set_font('Times', 'B', 12)
-                self.set_text_color(*COLOR_PRIMARY)
-            else:
-                self.set_font('Times', '', 11)
-                self.set_text_color(30, 30, 30)
-
-            # 2. Process Links within the line
-            parts = re.split(r'<([^|]+)\|([^>]+)>', line)
-            
-            for i, part in enumerate(parts):
-                text_part = clean_text_for_pdf(part)
-                if not text_part: continue
-
-                if i % 3 == 0:
-                    # Normal text (or the text before a link) which might contain *bold*
-                    self.write_styled_text(text_part)
-                elif i % 3 == 2:
-                    # Link Text
-                    url = parts[i-1] 
-                    
-                    # Style Link
-                    current_font = self.font_family
-                    current_style = self.font_style
-                    current_size = self.font_size_pt
-                    current_color = self.text_color
-                    
-                    self.set_text_color(*COLOR_ACCENT)
-                    self.set_font('', 'U')
-                    
-                    # Links shouldn't have bold markers usually.
-                    self.write(5, text_part, link=url)
-                    
-                    # Reset style
-                    self.set_text_color(current_color.r, current_color.g, current_color.b)
-                    self.set_font(current_font, current_style, current_size)
-            
+
+            for style, text, link in styled_runs(paragraph, base):
+                self.apply_style(style)
+                self.write_run(5, text, link)
+
             self.ln(6) # New line after each paragraph/item
-            
+
             # If it was a summary paragraph (not a headline), add extra blank line
             if not is_headline:
                 self.ln(2)
 
+def styled_runs(paragraph, base):
+    """
+    Resolves each span's style against the paragraph's base style and
+    merges neighbours that end up identical (same style and link).
+    *bold* toggles Bold (so it reads regular inside a headline); links are
+    underlined in the accent color.
+    Returns: list of (style, cleaned text, link)
+    """
+    family, font_style, size, _ = base
+    bold = (family, font_style.replace('B', '') if 'B' in font_style else font_style + 'B', size, base[3])
+    link_style = (family, 'U', size, COLOR_ACCENT)
+
+    runs = []
+    for span in paragraph.spans:
+        text = clean_text_for_pdf(span.text)
+        if not text:
+            continue
+        if span.kind == document.LINK:
+            style, link = link_style, span.url
+        else:
+            style, link = (bold if span.kind == document.BOLD else base), ""
+        if runs and runs[-1][0] == style and runs[-1][2] == link:
+            runs[-1] = (style, runs[-1][1] + text, link)
+        else:
+            runs.append((style, text, link))
+    return runs
+
+# Standardize quotes, dashes and bullets for Latin-1 (built once)
+PDF_TRANSLATION = str.maketrans({
+    '‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-',
+    '…': '...', '\u2022': '*'
+})
+
 def clean_text_for_pdf(text):
     if not text: return ""
-    # Standardize quotes and dashes for Latin-1
-    replacements = {
-        '‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-',
-        '…': '...', '\u2022': '*', '**': ''
-    }
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-    
+    text = text.translate(PDF_TRANSLATION)
+    if '**' in text:
+        text = text.replace('**', '')
+    if text.isascii():
+        return text
     return text.encode('latin-1', 'replace').decode('latin-1')
 
-def generate_daily_pdf(ai_report, learning_item=None):
+# Mapping Config Keys (with emojis) to Clean PDF Titles
+# Usage: { ConfigKeySubstring: DisplayTitle }
+SECTION_MAPPING = {
+    "International Law": "International News",
+    "International Relations": "International Relations", 
+    "National": "National & Political (Pakistan)",
+    "Tech": "Tech & Innovation"
+}
+
+def section_plan(categories):
+    """
+    Decides which category fills each PDF section, in print order.
+    Returns: list [ (category, display_title), ... ]
+    """
+    plan = []
+    for match_string, display_title in SECTION_MAPPING.items():
+        # First category whose key contains the match_string
+        for category in categories:
+            if match_string in category:
+                plan.append((category, display_title))
+                break
+    return plan
+
+def start_daily_pdf():
     pdf = NewspaperPDF()
     pdf.set_auto_page_break(auto=True, margin=20)
     pdf.set_margins(10, 10, 10)
     pdf.add_page()
-    
-    # Mapping Config Keys (with emojis) to Clean PDF Titles
-    # Usage: { ConfigKeySubstring: DisplayTitle }
-    SECTION_MAPPING = {
-        "International Law": "International News",
-        "International Relations": "International Relations", 
-        "National": "National & Political (Pakistan)",
-        "Tech": "Tech & Innovation"
-    }
-
-    # Normalize input keys for flexible matching
-    # Create a lookup: { CleanedKeySubstring: Content }
-    content_map = {}
-    for k, v in ai_report.items():
-        # Remove emojis and whitespace for safer matching
-        clean_key = re.sub(r'[^\w\s&]', '', k).strip() 
-        content_map[clean_key] = v
-        # Also map the raw key just in case
-        content_map[k] = v
+    return pdf
 
-    # Iterate through our desired order
-    for match_string, display_title in SECTION_MAPPING.items():
-        # Find content that contains the match_string
-        found_content = None
-        
-        # 1. Try exact match in normalized map key
-        for actual_key, content in ai_report.items():
-            if match_string in actual_key:
-                found_content = content
-                break
-        
-        if found_content:
-            pdf.chapter_title(clean_text_for_pdf(display_title))
-            pdf.article_content(f"Latest Developments in {display_title}", found_content)
+def add_report_section(pdf, display_title, content):
+    if content:
+        pdf.chapter_title(clean_text_for_pdf(display_title))
+        pdf.article_content(f"Latest Developments in {display_title}", content)
 
-    # Save logic remains same...
+def save_daily_pdf(pdf):
     base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_dir = os.path.join(base_path, 'data')
     if not os.path.exists(data_dir):
@@ -233,3 +253,12 @@ def generate_daily_pdf(ai_report, learning_item=None):
     except Exception as e:
         print(f"  > Error generating PDF: {e}")
         return None
+
+def generate_daily_pdf(ai_report, learning_item=None):
+    pdf = start_daily_pdf()
+
+    # Iterate through our desired order
+    for category, display_title in section_plan(ai_report.keys()):
+        add_report_section(pdf, display_title, ai_report[category])
+
+    return save_daily_pdf(pdf)
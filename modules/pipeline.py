@@ -0,0 +1,195 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import RSS_FEEDS, PIPELINE_MODE, DEDUP_ENABLED, SUMMARY_WORKERS, INCREMENTAL_ENABLED
+from modules import http_client, metrics, replay, summary_state
+from modules.news_fetcher import fetch_rss_news, iter_rss_news, filter_by_interests
+from modules.clustering import cluster_stories
+from modules.ai_handler import summarize_news, summarize_category, batching_active
+from modules.learning_engine import fetch_daily_learning
+from modules.dedup import mark_covered
+
+# The PDF and Slack stages (fpdf, slack_sdk) are imported inside the run
+# functions, so importing the pipeline stays cheap for the scheduler and
+# for tools that only need one stage.
+
+def run_sequential():
+    """
+    Classic barrier pipeline: every stage finishes before the next starts.
+    """
+    from modules.pdf_generator import generate_daily_pdf
+    from modules.slack_bot import send_daily_digest
+
+    # 1. Fetch
+    print("Fetching news...")
+    with metrics.stage("fetch"):
+        news_data = fetch_rss_news()
+
+    # 2. Filter
+    print("Filtering news...")
+    with metrics.stage("filter"):
+        news_roundup = filter_by_interests(news_data)
+
+    # 2b. Cluster
+    print("Clustering near-duplicate stories...")
+    with metrics.stage("cluster"):
+        news_roundup = cluster_stories(news_roundup)
+
+    # 3. Summarize
+    print("Generating AI Summaries...")
+    with metrics.stage("summarize"):
+        ai_report = summarize_news(news_roundup)
+
+    # 4. Learning
+    print("Fetching learning content...")
+    learning_item = fetch_daily_learning()
+
+    # 5. PDF
+    print("Generating PDF...")
+    with metrics.stage("pdf"):
+        pdf_path = generate_daily_pdf(ai_report, learning_item)
+
+    # 6. Send
+    print("Sending to Slack...")
+    with metrics.stage("slack"):
+        delivered = send_daily_digest(ai_report, learning_item, pdf_path)
+
+    return ai_report, news_roundup, delivered
+
+def run_streaming():
+    """
+    Overlapped pipeline: each category is filtered, clustered and handed to
+    the summarizer as soon as its own feeds are in, while other feeds are
+    still downloading. Slack blocks and PDF sections are rendered as each
+    summary arrives (the PDF in print order), so wall time approaches the
+    slowest single category instead of the sum of all stages.
+    """
+    from modules.pdf_generator import section_plan, start_daily_pdf, add_report_section, save_daily_pdf
+    from modules.slack_bot import send_daily_digest, build_section_blocks
+
+    categories = list(RSS_FEEDS)
+    summaries = {}
+    slack_sections = {}
+    news_roundup = {}
+
+    # Summaries are handed back to this thread, which owns all rendering
+    results = queue.Queue()
+
+    # Concurrent LLM workers; ai_handler's shared limiter keeps them within quota
+    llm_pool = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS)
+    side_pool = ThreadPoolExecutor(max_workers=2)
+
+    def summarize_and_publish(category, articles):
+        try:
+            with metrics.stage("summarize (per category)"):
+                summary = summarize_category(category, articles)
+        except Exception as e:
+            print(f"  > Summarization failed for {category}: {e}")
+            summary = "⚠️ Analysis Failed: All models in hierarchy failed to respond."
+        results.put((category, summary))
+
+    def feed_summarizer():
+        dispatched = set()
+        fetch_start = time.perf_counter()
+        try:
+            # Replays release categories in config order so dedup stays repeatable
+            for category, articles in iter_rss_news(in_order=replay.is_replaying()):
+                with metrics.stage("filter + cluster"):
+                    roundup = cluster_stories(filter_by_interests({category: articles}))
+                news_roundup.update(roundup)
+                print(f"  > Queued {category} for summarization.")
+                llm_pool.submit(summarize_and_publish, category, roundup[category])
+                dispatched.add(category)
+        except Exception as e:
+            print(f"  > Fetch stage failed: {e}")
+        finally:
+            metrics.add_timing("fetch", time.perf_counter() - fetch_start)
+            # Never leave the render loop waiting on a category that won't come
+            for category in categories:
+                if category not in dispatched:
+                    news_roundup.setdefault(category, [])
+                    llm_pool.submit(summarize_and_publish, category, [])
+
+    print("Fetching news and streaming categories into summarization...")
+    learning_future = side_pool.submit(fetch_daily_learning)
+    side_pool.submit(feed_summarizer)
+
+    pdf = start_daily_pdf()
+    plan = section_plan(categories)
+    next_section = 0
+
+    for _ in categories:
+        category, summary = results.get()
+        summaries[category] = summary
+        print(f"  > Rendering {category}...")
+        with metrics.stage("render (incremental)"):
+            slack_sections[category] = build_section_blocks(category, summary)
+
+            # Write every PDF section whose turn has come
+            while next_section < len(plan) and plan[next_section][0] in summaries:
+                planned_category, display_title = plan[next_section]
+                add_report_section(pdf, display_title, summaries[planned_category])
+                next_section += 1
+
+    llm_pool.shutdown()
+    side_pool.shutdown()
+
+    # Keep the report in config order regardless of completion order
+    ai_report = {category: summaries[category] for category in categories}
+    learning_item = learning_future.result()
+
+    print("Generating PDF...")
+    with metrics.stage("pdf"):
+        pdf_path = save_daily_pdf(pdf)
+
+    print("Sending to Slack...")
+    with metrics.stage("slack"):
+        delivered = send_daily_digest(
+            ai_report, learning_item, pdf_path,
+            sections=[slack_sections[category] for category in categories]
+        )
+
+    return ai_report, {category: news_roundup.get(category, []) for category in categories}, delivered
+
+def run_digest(mode=PIPELINE_MODE):
+    """
+    Runs one full digest cycle in the configured pipeline mode.
+    Returns: ai_report dict
+    """
+    start = time.time()
+    metrics.reset()
+    if replay.is_replaying():
+        replay.start()
+    elif replay.is_recording():
+        print("  > Recording all feed, Bytez and Slack traffic as fixtures...")
+
+    if mode == "streaming" and batching_active():
+        # Batches need several categories at once; streaming hands them over one by one
+        print("  > Batched generation needs every category up front; using the sequential pipeline.")
+        mode = "sequential"
+
+    if mode == "streaming":
+        ai_report, news_roundup, delivered = run_streaming()
+    else:
+        ai_report, news_roundup, delivered = run_sequential()
+
+    # Remember what was covered so the next run skips it. Only stories
+    # that reached Slack in a section count (local ones included): a failed
+    # delivery or a failed section is retried with the same stories next run.
+    if delivered:
+        covered = {
+            category: articles for category, articles in news_roundup.items()
+            if summary_state.covers_stories(ai_report.get(category))
+        }
+        if DEDUP_ENABLED:
+            mark_covered(covered)
+        if INCREMENTAL_ENABLED:
+            summary_state.commit(ai_report, news_roundup)
+    else:
+        print("  > Digest was not delivered; its stories stay eligible for the next run.")
+
+    metrics.add_timing("total", time.time() - start)
+    http_client.report_connection_reuse()
+    metrics.print_report()
+    print(f"  > Digest cycle ({mode}) took {time.time() - start:.1f}s.")
+    return ai_report
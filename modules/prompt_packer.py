@@ -0,0 +1,67 @@
+import html
+import re
+from config import (
+    MODEL_CONTEXT_WINDOWS, DEFAULT_CONTEXT_WINDOW, PROMPT_OUTPUT_RESERVE_TOKENS,
+    PROMPT_MAX_INPUT_TOKENS, PROMPT_SUMMARY_CHARS
+)
+from modules.rate_limiter import estimate_tokens
+
+def article_budget(model, fixed_text):
+    """
+    Tokens left for article lines once the model's output reserve and the
+    fixed parts of the prompt (system prompt, instructions) are paid for.
+    """
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    available = window - PROMPT_OUTPUT_RESERVE_TOKENS - estimate_tokens(fixed_text)
+    return max(0, min(available, PROMPT_MAX_INPUT_TOKENS))
+
+def article_line(idx, article):
+    # Safety: Escape curly braces in titles to prevent f-string errors
+    title = article['title'].replace('{', '{{').replace('}', '}}')
+    link = article['link'].replace('{', '{{').replace('}', '}}')
+    line = f"{idx}. {title} - {link}"
+    # Same story from other outlets (merged by clustering)
+    related = article.get('related_links') or []
+    if related:
+        line += f" (also: {', '.join(related[:3])})"
+    return line + "\n"
+
+def summary_line(article, max_chars=PROMPT_SUMMARY_CHARS):
+    """
+    The article's RSS summary as plain text, cut at a word boundary.
+    Returns: "   Summary: ...\n", or "" when the feed had none
+    """
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', article.get('summary') or ''))
+    text = ' '.join(text.split())
+    if not text:
+        return ""
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(' ', 1)[0] + "…"
+    return f"   Summary: {text}\n"
+
+def pack_articles(articles, budget_tokens, include_summaries=True, summary_chars=PROMPT_SUMMARY_CHARS):
+    """
+    Fills a token budget with article lines in rank order, then spends what
+    is left on truncated summaries (again in rank order).
+    Returns: (news_content, articles_included)
+    """
+    lines = []
+    used = 0
+    for idx, article in enumerate(articles, 1):
+        line = article_line(idx, article)
+        cost = estimate_tokens(line)
+        if used + cost > budget_tokens:
+            break
+        lines.append(line)
+        used += cost
+
+    summaries = [""] * len(lines)
+    if include_summaries:
+        for i in range(len(lines)):
+            extra = summary_line(articles[i], summary_chars)
+            cost = estimate_tokens(extra) if extra else 0
+            if extra and used + cost <= budget_tokens:
+                summaries[i] = extra
+                used += cost
+
+    return "".join(line + summary for line, summary in zip(lines, summaries)), len(lines)
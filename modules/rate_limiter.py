@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets shared by all
+    summarization workers. acquire() blocks until both buckets can cover a
+    call; a 429 pauses every caller via pause(). A disabled limiter
+    doesn't pace calls, but still honours pause().
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, enabled=True):
+        self.enabled = enabled
+        self.rpm = float(requests_per_minute)
+        self.tpm = float(tokens_per_minute)
+        self.request_tokens = self.rpm
+        self.llm_tokens = self.tpm
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.updated = now
+        self.request_tokens = min(self.rpm, self.request_tokens + elapsed * self.rpm / 60)
+        self.llm_tokens = min(self.tpm, self.llm_tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens):
+        """
+        Blocks until one request and `tokens` LLM tokens are available.
+        Returns: seconds spent waiting
+        """
+        # A single call larger than the whole bucket only has to wait for a full one
+        tokens = min(tokens, self.tpm)
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0 and not self.enabled:
+                    return waited
+                if wait <= 0:
+                    wait = max(
+                        (1 - self.request_tokens) * 60 / self.rpm,
+                        (tokens - self.llm_tokens) * 60 / self.tpm,
+                    )
+                    if wait <= 0:
+                        self.request_tokens -= 1
+                        self.llm_tokens -= tokens
+                        return waited
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        """
+        Holds back every caller for `seconds` (e.g. after a 429).
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def parse_retry_after(value):
+    """
+    Retry-After header (delta-seconds or HTTP-date) -> seconds, or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Delay before retry number `attempt` (0-based): the server's Retry-After
+    if it sent one, otherwise exponential backoff with jitter.
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX_SECONDS * 5)
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+    # Equal jitter: never retry instantly, never all workers in lockstep
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+def estimate_tokens(text):
+    # ~4 characters per token for English prose
+    return len(text) // 4 + 1
@@ -0,0 +1,307 @@
+"""
+Record/replay layer for running the whole pipeline offline.
+
+record : the pipeline talks to the real feeds, Bytez and Slack, and every
+         response is snapshotted into REPLAY_FIXTURES_DIR.
+replay : all traffic is routed to a local stand-in HTTP server that serves
+         those fixtures, with configurable latency, 429 injection and
+         failures. Bytez calls without a fixture get a deterministic
+         synthetic summary, so a replay needs only feed fixtures.
+
+Fixture layout:
+    feeds/index.json        { feed_url: {file, content_type} }
+    feeds/<sha1>.xml        raw feed body
+    bytez/<sha256>.json     { model, status, body } keyed by model + payload
+    slack/calls.json        [ {method, request, response}, ... ]
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from config import (
+    REPLAY_MODE, REPLAY_FIXTURES_DIR, REPLAY_FEED_LATENCY, REPLAY_LLM_LATENCY,
+    REPLAY_SLACK_LATENCY, REPLAY_429_RATE, REPLAY_FAILURE_RATE, REPLAY_SEED,
+    REPLAY_SLOW_MODEL, REPLAY_SLOW_LATENCY
+)
+
+BYTEZ_HOST = "api.bytez.com"
+SLACK_API_URL = "https://slack.com/api/"
+
+_lock = threading.Lock()
+_server = None
+_base_url = None
+
+# Slack calls seen by the stand-in during this process (for assertions/benchmarks)
+slack_calls = []
+
+def is_recording():
+    return REPLAY_MODE == "record"
+
+def is_replaying():
+    return REPLAY_MODE == "replay"
+
+def _fixture_path(*parts):
+    return os.path.join(REPLAY_FIXTURES_DIR, *parts)
+
+def feed_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+def bytez_key(model, payload):
+    # Streamed and plain calls for the same prompt share a fixture
+    payload = {k: v for k, v in payload.items() if k != "stream"}
+    blob = json.dumps({"model": model, "payload": payload}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+def _chance(key, rate):
+    """
+    Deterministic per-key coin flip, independent of thread scheduling.
+    """
+    if rate <= 0:
+        return False
+    digest = hashlib.sha256(f"{REPLAY_SEED}:{key}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32 < rate
+
+def _read_json(path, default):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Error reading fixture {path}: {e}")
+    return default
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+# -------------------------------------------------------------------------
+# Recording (called from the HTTP call sites when REPLAY_MODE == "record")
+# -------------------------------------------------------------------------
+
+def record_feed(url, response):
+    """
+    Snapshots a 200 feed response. Reads the full body, which requests keeps,
+    so a later iter_content() still sees every byte.
+    """
+    if response.status_code != 200:
+        return
+    body = response.content
+    name = feed_key(url) + ".xml"
+    with _lock:
+        os.makedirs(_fixture_path("feeds"), exist_ok=True)
+        with open(_fixture_path("feeds", name), 'wb') as f:
+            f.write(body)
+        index = _read_json(_fixture_path("feeds", "index.json"), {})
+        index[url] = {"file": name, "content_type": response.headers.get('Content-Type', 'application/xml')}
+        _write_json(_fixture_path("feeds", "index.json"), index)
+
+def record_bytez(model, payload, status, body):
+    with _lock:
+        _write_json(
+            _fixture_path("bytez", bytez_key(model, payload) + ".json"),
+            {"model": model, "status": status, "body": body}
+        )
+
+def record_slack(method, request, response):
+    with _lock:
+        path = _fixture_path("slack", "calls.json")
+        calls = _read_json(path, [])
+        calls.append({"method": method, "request": request, "response": response})
+        _write_json(path, calls)
+
+# -------------------------------------------------------------------------
+# Replay stand-in server
+# -------------------------------------------------------------------------
+
+def _synthetic_section(header, raw):
+    lines = [
+        f"{i}. *{title.strip()}* (via <{link.strip().strip('[]')}|Source>)."
+        for i, (title, link) in enumerate(re.findall(r'^\d+\.\s*(.+?)\s+-\s+(\S+)', raw, re.MULTILINE), 1)
+    ]
+    return f"{header}\n" + "\n".join(lines or ["No stories."])
+
+def synthesize_summary(model, payload):
+    """
+    Deterministic stand-in for an LLM answer: one bullet per article line
+    found under RAW DATA in the prompt (per "=== SECTION ===" block for
+    batched prompts).
+    """
+    prompt = payload.get("messages", [{}])[-1].get("content", "")
+    section = re.search(r'SECTION:\s*(.+)', prompt)
+    raw = prompt.split("RAW DATA:", 1)[-1]
+    blocks = re.split(r'^=== SECTION:\s*(.+?)\s*===\s*$', raw, flags=re.MULTILINE)
+    if len(blocks) > 1:
+        return "\n\n".join(
+            f"### SECTION: {name}\n" + _synthetic_section(name, body)
+            for name, body in zip(blocks[1::2], blocks[2::2])
+        )
+    header = section.group(1).strip() if section else "Digest"
+    return _synthetic_section(header, raw)
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Attempts per Bytez key, so injected 429s clear on retry
+    attempts = {}
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # Clients drop streams they abort; nothing to report
+            pass
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+        elif isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, text, chunk_chars=64):
+        """
+        Streams text as a chunked plain-text body, like Bytez with "stream": true.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i in range(0, len(text), chunk_chars):
+                data = text[i:i + chunk_chars].encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early (stream abort or hedge cancel)
+            self.close_connection = True
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if not path.startswith("/feeds/"):
+            return self._send(404, {"error": "unknown route"})
+
+        time.sleep(REPLAY_FEED_LATENCY)
+        key = path[len("/feeds/"):]
+        if _chance("feed:" + key, REPLAY_FAILURE_RATE):
+            return self._send(500, "injected failure", "text/plain")
+
+        index = _read_json(_fixture_path("feeds", "index.json"), {})
+        entry = next((e for url, e in index.items() if feed_key(url) == key), None)
+        if not entry or not os.path.exists(_fixture_path("feeds", entry["file"])):
+            return self._send(404, "no fixture", "text/plain")
+        with open(_fixture_path("feeds", entry["file"]), 'rb') as f:
+            return self._send(200, f.read(), entry.get("content_type", "application/xml"))
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._body()
+        if path.startswith("/bytez/"):
+            return self._bytez(path[len("/bytez"):], body)
+        if path.startswith("/slack/api/"):
+            return self._slack(path[len("/slack/api/"):], body)
+        if path.startswith("/slack/upload/"):
+            time.sleep(REPLAY_SLACK_LATENCY)
+            return self._send(200, "OK", "text/plain")
+        return self._send(404, {"error": "unknown route"})
+
+    def _bytez(self, path, body):
+        model = path.split("/models/v2/", 1)[-1]
+        payload = json.loads(body or b"{}")
+        key = bytez_key(model, payload)
+
+        with _lock:
+            attempt = self.attempts.get(key, 0)
+            self.attempts[key] = attempt + 1
+
+        if attempt == 0 and _chance("429:" + key, REPLAY_429_RATE):
+            return self._send(429, {"error": "rate limited (injected)"}, headers={"Retry-After": "1"})
+        if _chance(f"fail:{key}:{attempt}", REPLAY_FAILURE_RATE):
+            return self._send(500, {"error": "injected failure"})
+
+        time.sleep(REPLAY_SLOW_LATENCY if model == REPLAY_SLOW_MODEL else REPLAY_LLM_LATENCY)
+        fixture = _read_json(_fixture_path("bytez", key + ".json"), None)
+        if fixture and (fixture["status"] != 200 or not payload.get("stream")):
+            return self._send(fixture["status"], fixture["body"])
+        if fixture:
+            output = (json.loads(fixture["body"]).get("output") or {}).get("content", "")
+        else:
+            output = synthesize_summary(model, payload)
+        if payload.get("stream"):
+            return self._send_stream(output)
+        return self._send(200, {"error": None, "output": {"role": "assistant", "content": output}})
+
+    def _slack(self, method, body):
+        time.sleep(REPLAY_SLACK_LATENCY)
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            request = json.loads(body or b"{}")
+        else:
+            request = {k: v[0] for k, v in parse_qs(body.decode('utf-8')).items()}
+
+        with _lock:
+            slack_calls.append({"method": method, "request": request})
+
+        if method == "files.getUploadURLExternal":
+            file_id = f"FREPLAY{len(slack_calls)}"
+            return self._send(200, {"ok": True, "file_id": file_id, "upload_url": f"{_base_url}/slack/upload/{file_id}"})
+        if method == "files.completeUploadExternal":
+            files = json.loads(request.get("files", "[]"))
+            return self._send(200, {"ok": True, "files": [{"id": f.get("id"), "title": f.get("title")} for f in files]})
+
+        # Serve the recorded answer for this call, if any
+        recorded = [c for c in _read_json(_fixture_path("slack", "calls.json"), []) if c["method"] == method]
+        seen = sum(1 for c in slack_calls if c["method"] == method) - 1
+        if seen < len(recorded):
+            return self._send(200, recorded[seen]["response"])
+        return self._send(200, {"ok": True, "channel": request.get("channel"), "ts": f"{time.time():.6f}"})
+
+def start():
+    """
+    Starts the stand-in server (once) and seeds randomness for repeatable runs.
+    Returns: base URL of the stand-in
+    """
+    global _server, _base_url
+    with _lock:
+        if _server is None:
+            random.seed(REPLAY_SEED)
+            _server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+            _server.daemon_threads = True
+            _base_url = f"http://127.0.0.1:{_server.server_port}"
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            print(f"  > Replay stand-in serving {REPLAY_FIXTURES_DIR} at {_base_url}")
+    return _base_url
+
+def route(url):
+    """
+    Maps a real feed or Bytez URL to the stand-in when replaying.
+    """
+    if not is_replaying():
+        return url
+    base = start()
+    parts = urlsplit(url)
+    if parts.hostname == BYTEZ_HOST:
+        return f"{base}/bytez{parts.path}"
+    return f"{base}/feeds/{feed_key(url)}"
+
+def slack_base_url():
+    if not is_replaying():
+        return SLACK_API_URL
+    return f"{start()}/slack/api/"
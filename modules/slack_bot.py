@@ -1,7 +1,8 @@
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
 from datetime import datetime
-from config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN
+import os
+from config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN, SLACK_POST_INTERVAL
+from modules import document, replay
+from modules.slack_utils import render_mrkdwn
 import time
 
 def create_header_blocks(part_num=1, total_parts=1):
@@ -31,44 +32,48 @@ def create_header_blocks(part_num=1, total_parts=1):
         {"type": "divider"}
     ]
 
-from modules.slack_utils import clean_slack_markdown
+def build_section_blocks(category, raw_summary):
+    """
+    Renders one report section as Slack blocks.
+    Returns: (blocks, estimated_char_count)
+    """
+    # Render the (shared, cached) parse of the summary as Slack mrkdwn
+    summary = render_mrkdwn(document.parse(raw_summary))
 
-def paginate_report(ai_report):
+    # Create blocks for this section
+    section_blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": category.upper(),
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": summary
+            }
+        },
+        {"type": "divider"}
+    ]
+    
+    # Calculate size
+    section_len = len(category) + len(summary) + 100 
+    return section_blocks, section_len
+
+def paginate_sections(sections):
     """
-    Splits the full report into 'Pages' (lists of blocks) that fit Slack limits.
-    Each Page is a list of Slack blocks ready to send.
+    Packs pre-rendered sections [(blocks, char_count), ...] into 'Pages'
+    that fit Slack limits.
     """
     pages = []
     current_page_blocks = []
     current_char_count = 0
     
-    for category, raw_summary in ai_report.items():
-        # Clean the summary for Slack formatting
-        summary = clean_slack_markdown(raw_summary)
-
-        # Create blocks for this section
-        section_blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": category.upper(),
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": summary
-                }
-            },
-            {"type": "divider"}
-        ]
-        
-        # Calculate size
-        section_len = len(category) + len(summary) + 100 
-        
+    for section_blocks, section_len in sections:
         if current_char_count + section_len > 2000:
             # Setup current page to finish
             if current_page_blocks:
@@ -88,15 +93,37 @@ def paginate_report(ai_report):
         
     return pages
 
-def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
+def paginate_report(ai_report):
+    """
+    Splits the full report into 'Pages' (lists of blocks) that fit Slack limits.
+    Each Page is a list of Slack blocks ready to send.
+    """
+    return paginate_sections(
+        [build_section_blocks(category, raw_summary) for category, raw_summary in ai_report.items()]
+    )
+
+def send_daily_digest(ai_report, learning_item=None, pdf_path=None, sections=None):
+    """
+    Posts the report to Slack. `sections` may carry blocks already rendered
+    by build_section_blocks (streaming pipeline); otherwise they are built
+    from ai_report here.
+    Returns: True when every part of the digest was posted
+    """
     if not SLACK_BOT_TOKEN:
         print("Error: SLACK_BOT_TOKEN is missing.")
-        return
+        return False
 
-    client = WebClient(token=SLACK_BOT_TOKEN)
+    # Imported here: slack_sdk is only needed once there is something to post
+    from slack_sdk import WebClient
+    from slack_sdk.errors import SlackApiError
+
+    client = WebClient(token=SLACK_BOT_TOKEN, base_url=replay.slack_base_url())
     
     # 1. Paginate
-    pages = paginate_report(ai_report)
+    if sections is not None:
+        pages = paginate_sections(sections)
+    else:
+        pages = paginate_report(ai_report)
     
     # 2. Add Learning Content to the last page or as a new page
     if learning_item:
@@ -114,7 +141,8 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": f"*{learning_item.get('title', 'Daily Tip')}*\n{learning_item.get('content', '')}"
+                    "text": f"*{learning_item.get('title', 'Daily Tip')}*\n"
+                            + render_mrkdwn(document.parse(learning_item.get('content', '')))
                 }
             }
         ]
@@ -128,6 +156,7 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
     total_pages = len(pages)
     
     print(f"--- Dispatching {total_pages} Pages to Slack ---")
+    delivered = True
 
     for i, page_blocks in enumerate(pages):
         part_num = i + 1
@@ -136,17 +165,21 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
         final_blocks = create_header_blocks(part_num, total_pages) + page_blocks
         
         try:
-            client.chat_postMessage(
+            response = client.chat_postMessage(
                 channel=SLACK_APP_TOKEN, 
                 blocks=final_blocks,
                 text=f"Daily Intelligence | Part {part_num}/{total_pages}"
             )
+            if replay.is_recording():
+                replay.record_slack("chat.postMessage", {"part": part_num, "blocks": final_blocks}, response.data)
             print(f"  > Sent Part {part_num}")
-            time.sleep(1) # Rate limit safety
+            time.sleep(SLACK_POST_INTERVAL) # Rate limit safety
         except SlackApiError as e:
             print(f"  > Error sending Part {part_num}: {e.response['error']}")
             # Fallback for this specific part
-            if 'invalid_blocks' in str(e):
+            if 'invalid_blocks' not in str(e):
+                delivered = False
+            else:
                 print("    > Retrying as plain text...")
                 fallback_text = f"**PART {part_num}/{total_pages}**\n\n"
                 # Extract text from blocks roughly
@@ -154,10 +187,16 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
                     if block['type'] == 'section':
                         fallback_text += block['text']['text'] + "\n\n"
                 
-                client.chat_postMessage(
-                    channel=SLACK_APP_TOKEN,
-                    text=fallback_text
-                )
+                try:
+                    response = client.chat_postMessage(
+                        channel=SLACK_APP_TOKEN,
+                        text=fallback_text
+                    )
+                    if replay.is_recording():
+                        replay.record_slack("chat.postMessage", {"part": part_num, "text": fallback_text}, response.data)
+                except SlackApiError as e:
+                    print(f"  > Error sending Part {part_num} as plain text: {e.response['error']}")
+                    delivered = False
 
     # 3. Upload PDF Newspaper
     if pdf_path:
@@ -170,6 +209,8 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
                 initial_comment="Here is your Morning Edition PDF! 📄"
             )
             print("  > PDF Upload successful.")
+            if replay.is_recording():
+                replay.record_slack("files.upload_v2", {"file": os.path.basename(pdf_path)}, response.data)
             
             # Send explicit link as separate message - REMOVED TO PREVENT DOUBLE POSTING
             # The files_upload_v2 already posts the file to the channel with the initial_comment.
@@ -190,3 +231,5 @@ def send_daily_digest(ai_report, learning_item=None, pdf_path=None):
                 
         except SlackApiError as e:
             print(f"  > Error uploading PDF: {e.response['error']}")
+
+    return delivered
@@ -1,24 +1,33 @@
-import re
+from modules import document
 
-def clean_slack_markdown(text):
+def render_mrkdwn(paragraphs):
     """
-    Converts standard Markdown into Slack's specific 'mrkdwn' format.
-    1. Bold: **text** -> *text*
-    2. Links: [text](url) -> <url|text>
+    Renders a parsed document (modules.document) as Slack 'mrkdwn'.
+    1. Bold: **text** / *text* -> *text*
+    2. Links: [text](url) / <url|text> -> <url|text>
     3. Headers: ### text -> *text*
     """
-    # 1. Links: [text](url) -> <url|text>
-    # Note: Regex needs to be careful not to break existing <url|text> if AI did it right.
-    # We look for [text](url) pattern specifically.
-    link_pattern = r'\[([^\]]+)\]\((https?://[^)]+)\)'
-    text = re.sub(link_pattern, r'<\2|\1>', text)
-    
-    # 2. Bold: **text** -> *text*
-    bold_pattern = r'\*\*([^*]+)\*\*'
-    text = re.sub(bold_pattern, r'*\1*', text)
-    
-    # 3. Headers: ### text -> *text* (Make them bold)
-    header_pattern = r'###\s*(.+)'
-    text = re.sub(header_pattern, r'*\1*', text)
+    lines = []
+    for paragraph in paragraphs:
+        parts = []
+        for span in paragraph.spans:
+            if span.kind == document.LINK:
+                parts.append(f"<{span.url}|{span.text}>")
+            elif span.kind == document.BOLD and paragraph.kind != document.HEADING:
+                parts.append(f"*{span.text}*")
+            else:
+                parts.append(span.text)
+        line = "".join(parts)
+        if paragraph.kind == document.HEADING:
+            line = f"*{line}*"
+        # Keep the source's blank lines (not before the first paragraph)
+        if lines:
+            lines.extend([""] * paragraph.gap)
+        lines.append(paragraph.indent + line)
+    return "\n".join(lines)
 
-    return text
+def clean_slack_markdown(text):
+    """
+    Converts standard Markdown into Slack's specific 'mrkdwn' format.
+    """
+    return render_mrkdwn(document.parse(text))
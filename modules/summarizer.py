@@ -1,43 +1,174 @@
-from sumy.parsers.html import HtmlParser
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-from sumy.nlp.stemmers import Stemmer
-from sumy.utils import get_stop_words
-import nltk
-
-# Ensure necessary NLTK data is downloaded for Sumy
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+import html
+import re
+import numpy as np
+from modules.news_fetcher import article_source
+
+# Compact English stop-word list (function words only; news nouns stay in)
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+said same says she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where which while who whom
+why will with would you your yours yourself yourselves
+""".split())
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])["”’)\]]*\s+(?=["“‘(\[]?[A-Z0-9])')
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_TAG = re.compile(r'<[^>]+>')
+
+def plain_text(text):
+    """
+    RSS summary HTML -> single-spaced plain text.
+    """
+    return ' '.join(html.unescape(_TAG.sub(' ', text or '')).split())
+
+class ExtractiveSummarizer:
+    """
+    TF-IDF + TextRank sentence ranking on NumPy.
+
+    The tokenizer, stop words and ranking parameters are set up once; each
+    summarize_batch() call vectorizes all documents of a batch (e.g. one
+    category) into one TF-IDF matrix and ranks every sentence with a
+    single TextRank power iteration.
+    """
+
+    def __init__(self, stop_words=STOP_WORDS, damping=0.85, iterations=30, tolerance=1e-6):
+        self.stop_words = stop_words
+        self.damping = damping
+        self.iterations = iterations
+        self.tolerance = tolerance
+
+    def split_sentences(self, text):
+        return [s.strip() for s in _SENTENCE_END.split(text) if len(s.strip()) > 1]
+
+    def tokens(self, sentence):
+        return [t for t in _TOKEN.findall(sentence.lower()) if t not in self.stop_words and len(t) > 1]
+
+    def tfidf(self, sentences):
+        """
+        Returns: (n_sentences x vocabulary) matrix, rows L2-normalized
+        """
+        tokenized = [self.tokens(s) for s in sentences]
+        vocabulary = {}
+        for tokens in tokenized:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        counts = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+        for row, tokens in enumerate(tokenized):
+            for token in tokens:
+                counts[row, vocabulary[token]] += 1
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+        weights = np.log1p(counts) * idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        return weights / np.where(norms == 0, 1, norms)
+
+    def textrank(self, matrix):
+        """
+        PageRank over the cosine-similarity graph of the rows.
+        Returns: score per row
+        """
+        n = matrix.shape[0]
+        if n == 0:
+            return np.zeros(0)
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0)
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        # Isolated sentences link to everyone equally
+        transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1, out_weight), 1 / n)
+
+        scores = np.full(n, 1 / n)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < self.tolerance:
+                return updated
+            scores = updated
+        return scores
+
+    def summarize_batch(self, texts, sentences_count=2):
+        """
+        Ranks the sentences of all texts together (shared vocabulary/IDF,
+        one similarity graph), then picks each text's best sentences.
+        Returns: (list of summaries in original sentence order, per-text score)
+        """
+        sentences = []
+        owners = []
+        for index, text in enumerate(texts):
+            for sentence in self.split_sentences(text):
+                sentences.append(sentence)
+                owners.append(index)
+        if not sentences:
+            return [""] * len(texts), [0.0] * len(texts)
+
+        scores = self.textrank(self.tfidf(sentences))
+        owners = np.array(owners)
+
+        summaries = []
+        text_scores = []
+        for index in range(len(texts)):
+            rows = np.flatnonzero(owners == index)
+            if rows.size == 0:
+                summaries.append("")
+                text_scores.append(0.0)
+                continue
+            best = np.sort(rows[np.argsort(-scores[rows], kind='stable')[:sentences_count]])
+            summaries.append(" ".join(sentences[row] for row in best))
+            text_scores.append(float(scores[rows].max()))
+        return summaries, text_scores
+
+    def summarize(self, text, sentences_count=2):
+        return self.summarize_batch([text], sentences_count)[0][0]
+
+# Built once per process and shared (it holds no per-call state)
+ENGINE = ExtractiveSummarizer()
+
+def summarize_section(articles, max_items=8, sentences_count=1):
+    """
+    Slack-formatted extractive digest of one category, built locally in
+    milliseconds: the most central stories (TextRank over titles and RSS
+    summaries), each with its most representative sentence.
+    Returns: summary string
+    """
+    if not articles:
+        return "No major updates in this sector today."
+
+    texts = [f"{a['title'].rstrip('.')}. {plain_text(a.get('summary'))}" for a in articles]
+    # One extra sentence, since the title often ranks among the best
+    extracts, scores = ENGINE.summarize_batch(texts, sentences_count + 1)
+
+    # Most central stories first; ties keep the fetcher's recency order
+    order = sorted(range(len(articles)), key=lambda i: (-scores[i], i))[:max_items]
+    lines = ["_Extractive digest generated locally._"]
+    for i in order:
+        article = articles[i]
+        title = article['title'].strip()
+        detail = extracts[i].replace(f"{title.rstrip('.')}.", "", 1).strip()
+        detail = " ".join(ENGINE.split_sentences(detail)[:sentences_count])
+        line = f"- *{title}*"
+        if detail:
+            line += f" — {detail}"
+        lines.append(f"{line} (via <{article['link']}|{article_source(article) or 'Source'}>)")
+    return "\n\n".join(lines)
 
 def generate_summary(text, sentences_count=2, language="english"):
     """
-    Generates a generic summary using LSA.
-    Since RSS feeds often provide a summary/description, this is a fallback 
-    or utility if we fetch full article content (which is harder without scraping).
-    
-    For this 'Free' version, we will primarily rely on RSS descriptions to avoid 
-    heavy scraping/blocking issues, but this function is ready for full text.
+    Generic extractive summary of a text (TF-IDF + TextRank).
+    Kept for full-text use; `language` only supports English stop words.
     """
     try:
         if not text:
             return "No content to summarize."
-            
-        parser = PlaintextParser.from_string(text, Tokenizer(language))
-        stemmer = Stemmer(language)
-        summarizer = LsaSummarizer(stemmer)
-        summarizer.stop_words = get_stop_words(language)
-
-        summary_sentences = summarizer(parser.document, sentences_count)
-        return " ".join([str(s) for s in summary_sentences])
+        return ENGINE.summarize(plain_text(text), sentences_count)
     except Exception as e:
         return f"Could not summarize: {str(e)}"
 
 # Helper to clean HTML tags if RSS description is raw HTML
-from bs4 import BeautifulSoup
-
 def clean_html(html_content):
+    # Imported here: the summarization path itself only needs plain_text()
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html_content, "html.parser")
     return soup.get_text()
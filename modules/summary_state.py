@@ -0,0 +1,78 @@
+import json
+import os
+import time
+from config import SUMMARY_STATE_PATH, INCREMENTAL_MAX_AGE_HOURS
+
+# Sections that showed readers none of their stories
+NOT_DELIVERED = ("⚠️", "No major updates in this sector today.")
+# Summaries that must not become the base of the next update: the above,
+# plus local extractive sections (delivered, but not a model's digest)
+NON_SUMMARIES = NOT_DELIVERED + ("_Extractive digest generated locally._",)
+
+def is_summary(summary):
+    """
+    False for failures, placeholders and local sections (see NON_SUMMARIES).
+    """
+    return bool(summary) and not summary.startswith(NON_SUMMARIES)
+
+def covers_stories(summary):
+    """
+    True when the section put its stories in front of readers, so they
+    count as covered (dedup.mark_covered). Local sections do.
+    """
+    return bool(summary) and not summary.startswith(NOT_DELIVERED)
+
+def load_state():
+    """
+    Loads the last delivered summary of each category, dropping entries
+    older than INCREMENTAL_MAX_AGE_HOURS (those are rebuilt from scratch).
+    Returns: dict { category: {summary, article_ids, updated} }
+    """
+    cutoff = time.time() - INCREMENTAL_MAX_AGE_HOURS * 3600
+    try:
+        if os.path.exists(SUMMARY_STATE_PATH):
+            with open(SUMMARY_STATE_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return {k: v for k, v in data.items() if v.get('updated', 0) >= cutoff}
+    except Exception as e:
+        print(f"Error loading summary state: {e}")
+    return {}
+
+def save_state(state):
+    try:
+        os.makedirs(os.path.dirname(SUMMARY_STATE_PATH), exist_ok=True)
+        tmp_path = SUMMARY_STATE_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, SUMMARY_STATE_PATH)
+    except Exception as e:
+        print(f"Error saving summary state: {e}")
+
+def previous(category):
+    """
+    Returns: (prior summary or None, set of article ids it already covers)
+    """
+    entry = load_state().get(category)
+    if not entry:
+        return None, set()
+    return entry['summary'], set(entry.get('article_ids', []))
+
+def commit(ai_report, categorized_news):
+    """
+    Stores each delivered summary with the articles behind it. Call this
+    only after the digest was delivered, like dedup.mark_covered.
+    """
+    state = load_state()
+    now = time.time()
+    for category, summary in ai_report.items():
+        if not is_summary(summary):
+            continue
+        entry = state.get(category)
+        # A summary reused unchanged keeps its original age, so it still expires
+        if entry and entry['summary'] == summary:
+            continue
+        ids = set(entry.get('article_ids', [])) if entry else set()
+        ids.update(article.get('id') or article.get('link') for article in categorized_news.get(category, []))
+        state[category] = {'summary': summary, 'article_ids': sorted(ids), 'updated': now}
+    save_state(state)
@@ -1,7 +1,7 @@
 from fpdf import FPDF
 from datetime import datetime
 import os
-import re
+from modules import document
 
 # --- COLORS ---
 # Navy Blue: #2C3E50 -> (44, 62, 80)
@@ -50,35 +50,25 @@ class PDF(FPDF):
     def chapter_body(self, body):
         self.set_font('Arial', '', 11)
         self.set_text_color(50, 50, 50)
-        
-        # Parse Slack-style links <url|text> and render
-        # We split by the regex pattern to get chunks of (text, url)
-        # Pattern: <(http[^|]+)\|([^>]+)>
-        parts = re.split(r'<([^|]+)\|([^>]+)>', body)
-        
-        # Starting content
-        for i, part in enumerate(parts):
-            if i == 0:
-                # Normal text
-                self.write(6, clean_text_for_pdf(part))
-            elif i % 3 == 0:
-                # This is normal text after a link
-                self.write(6, clean_text_for_pdf(part))
-            elif i % 3 == 2:
-                # This is the LINK TEXT (captured in group 2)
-                # The previous part (i-1) was the URL (group 1)
-                url = parts[i-1]
-                link_text = part
-                
-                # Render Link
-                self.set_text_color(39, 174, 96) # Green Link
-                self.set_font('', 'U')
-                self.write(6, clean_text_for_pdf(link_text), link=url)
-                
-                # Reset
-                self.set_text_color(50, 50, 50)
-                self.set_font('', '')
-        
+
+        # Render from the shared parse (modules.document): links in green,
+        # bold and headers as plain text
+        for index, paragraph in enumerate(document.parse(body)):
+            if index:
+                self.write(6, "\n" * (1 + paragraph.gap))
+            for span in paragraph.spans:
+                if span.kind == document.LINK:
+                    # Render Link
+                    self.set_text_color(39, 174, 96) # Green Link
+                    self.set_font('', 'U')
+                    self.write(6, clean_text_for_pdf(span.text), link=span.url)
+
+                    # Reset
+                    self.set_text_color(50, 50, 50)
+                    self.set_font('', '')
+                else:
+                    self.write(6, clean_text_for_pdf(span.text))
+
         self.ln(8)
 
 def clean_text_for_pdf(text):
@@ -1,36 +1,145 @@
-from modules.news_fetcher import fetch_rss_news, filter_by_interests
-from modules.ai_handler import summarize_news
-from modules.learning_engine import fetch_daily_learning
-from modules.pdf_generator import generate_daily_pdf
-from modules.slack_bot import send_daily_digest
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Modules timed by --profile-startup, roughly in the order a run needs them
+STARTUP_MODULES = [
+    "config",
+    "modules.news_fetcher",
+    "modules.clustering",
+    "modules.ai_handler",
+    "modules.summarizer",
+    "modules.analyst",
+    "modules.pdf_generator",
+    "modules.slack_bot",
+    "modules.pipeline",
+]
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
 
 def run_once():
+    # Imported here so --record/--replay can configure the environment first
+    from modules.pipeline import run_digest
+
     print("--- INITIATING AI INTELLIGENCE CYCLE (MANUAL MOCK RUN) ---")
     
-    # 1. Fetch
-    print("Fetching news...")
-    news_data = fetch_rss_news()
-    
-    # 2. Filter
-    print("Filtering news...")
-    news_roundup = filter_by_interests(news_data)
-    
-    # 3. Summarize
-    print("Generating AI Summaries...")
-    ai_report = summarize_news(news_roundup)
-    
-    # 4. Learning
-    print("Fetching learning content...")
-    learning_item = fetch_daily_learning()
-    
-    # 5. PDF
-    print("Generating PDF...")
-    pdf_path = generate_daily_pdf(ai_report, learning_item)
-    
-    # 6. Send
-    print("Sending to Slack...")
-    send_daily_digest(ai_report, learning_item, pdf_path)
+    # Fetch -> Filter -> Cluster -> Summarize -> PDF -> Slack
+    # (stage order and overlap are set by PIPELINE_MODE in config.py)
+    run_digest()
     print("--- CYCLE COMPLETE ---")
 
+def import_cost(module):
+    """
+    Imports `module` in a fresh interpreter under -X importtime.
+    Returns: (cumulative ms, [(dependency, ms), ...] heaviest first), or
+             (None, error message) when the import fails
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+
+    # Children are listed before their parent; the module's own subtree is
+    # everything since the previous top-level entry (interpreter startup)
+    subtree = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        if not indent:
+            if name == module:
+                break
+            subtree = []
+            continue
+        subtree.append((name, int(cumulative)))
+    total = int(cumulative) / 1000
+
+    # Cost per top-level package pulled in, excluding this project's own
+    heaviest = {}
+    for name, cumulative in subtree:
+        root = name.split(".")[0]
+        if root not in ("config", "modules"):
+            heaviest[root] = max(heaviest.get(root, 0), cumulative / 1000)
+    return total, sorted(heaviest.items(), key=lambda item: -item[1])
+
+def profile_startup():
+    """
+    Prints the cold import cost of each pipeline module, so a heavy
+    dependency slipping back into an import path shows up.
+    """
+    print(f"{'ms':>8}  module  (heaviest dependencies)")
+    for module in STARTUP_MODULES:
+        total, detail = import_cost(module)
+        if total is None:
+            print(f"{'failed':>8}  {module}  ({detail})")
+            continue
+        heaviest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in detail[:3])
+        print(f"{total:>8.1f}  {module}" + (f"  ({heaviest})" if heaviest else ""))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the daily digest once.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_true",
+                      help="Run live and snapshot feed, Bytez and Slack traffic as fixtures.")
+    mode.add_argument("--replay", action="store_true",
+                      help="Run fully offline against local stand-ins serving the fixtures.")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Bypass the Bytez response cache (always call the models).")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Don't pace Bytez calls to the per-minute quota (offline replays).")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Start the next model in parallel when the first one is slow.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the last digest with new articles only; skip unchanged categories.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream Bytez output, dropping reasoning as it arrives.")
+    parser.add_argument("--batch", action="store_true",
+                        help="Summarize several categories per request on large-context models.")
+    parser.add_argument("--full-text", action="store_true",
+                        help="Enrich prompts with summaries extracted from the full articles.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report the import-time cost of each module and exit.")
+    parser.add_argument("--fixtures", help="Fixtures directory (default: data/fixtures).")
+    parser.add_argument("--feed-latency", type=float, help="Replay: seconds added to each feed response.")
+    parser.add_argument("--llm-latency", type=float, help="Replay: seconds added to each Bytez response.")
+    parser.add_argument("--rate-limit-rate", type=float, help="Replay: share of Bytez calls answered with one 429.")
+    parser.add_argument("--failure-rate", type=float, help="Replay: share of requests answered with a 500.")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_startup:
+        profile_startup()
+        sys.exit(0)
+    if args.no_llm_cache:
+        os.environ["DIGEST_NO_LLM_CACHE"] = "1"
+    if args.no_rate_limit:
+        os.environ["DIGEST_NO_RATE_LIMIT"] = "1"
+    if args.hedge:
+        os.environ["DIGEST_HEDGE"] = "1"
+    if args.incremental:
+        os.environ["DIGEST_INCREMENTAL"] = "1"
+    if args.stream:
+        os.environ["DIGEST_STREAM"] = "1"
+    if args.batch:
+        os.environ["DIGEST_BATCH"] = "1"
+    if args.full_text:
+        os.environ["DIGEST_FULL_TEXT"] = "1"
+    if args.record or args.replay:
+        os.environ["DIGEST_REPLAY"] = "record" if args.record else "replay"
+    for flag, env_name in (
+        ("fixtures", "DIGEST_FIXTURES_DIR"),
+        ("feed_latency", "DIGEST_REPLAY_FEED_LATENCY"),
+        ("llm_latency", "DIGEST_REPLAY_LLM_LATENCY"),
+        ("rate_limit_rate", "DIGEST_REPLAY_429_RATE"),
+        ("failure_rate", "DIGEST_REPLAY_FAILURE_RATE"),
+    ):
+        value = getattr(args, flag)
+        if value is not None:
+            os.environ[env_name] = str(value)
     run_once()
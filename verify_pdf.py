@@ -13,9 +13,10 @@ learning_item = {
     "content": "Post-quantum cryptography (PQC) refers to cryptographic algorithms (usually public-key algorithms) that are thought to be secure against a cryptanalytic attack by a quantum computer. As quantum computers become more powerful, current encryption standards like RSA will become vulnerable."
 }
 
-print("Generating Test PDF...")
-path = generate_daily_pdf(ai_report, learning_item)
-if path:
-    print(f"Success! PDF at: {path}")
-else:
-    print("Failed to generate PDF.")
+if __name__ == "__main__":
+    print("Generating Test PDF...")
+    path = generate_daily_pdf(ai_report, learning_item)
+    if path:
+        print(f"Success! PDF at: {path}")
+    else:
+        print("Failed to generate PDF.")